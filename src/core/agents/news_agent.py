@@ -69,6 +69,10 @@ class NewsAgent:
         Returns:
             Claude's response text
         """
+        if not prompt.strip():
+            logger.error("Empty prompt; not calling Claude.")
+            return "Error: Empty prompt."
+        
         try:
             async with self.conversation as conv:
                 response_chunks = []
@@ -177,15 +181,11 @@ URL: {article.url}
             # Get comprehensive news for analysis
             logger.info(f"Fetching {region} news for context analysis")
             
-            # Get both general and political news for richer context
-            general_response = await self.search_service.search_headlines(
-                region=region, category='general', limit=8, hours_back=48
-            )
-            political_response = await self.search_service.search_headlines(
-                region=region, category='politics', limit=5, hours_back=48
-            )
-            business_response = await self.search_service.search_headlines(
-                region=region, category='business', limit=5, hours_back=48
+            # Get general, political and business news concurrently for richer context
+            general_response, political_response, business_response = await asyncio.gather(
+                self.search_service.search_headlines(region=region, category='general', limit=8, hours_back=48),
+                self.search_service.search_headlines(region=region, category='politics', limit=5, hours_back=48),
+                self.search_service.search_headlines(region=region, category='business', limit=5, hours_back=48)
             )
             general_articles = general_response.articles
             political_articles = political_response.articles
@@ -1,4 +1,5 @@
 from .vector_store import VectorStore
 from .doc_processor import DocumentProcessor
+from .batching import MicroBatcher
 
-__all__ = ["VectorStore", "DocumentProcessor"]
\ No newline at end of file
+__all__ = ["VectorStore", "DocumentProcessor", "MicroBatcher"]
\ No newline at end of file
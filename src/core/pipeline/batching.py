@@ -0,0 +1,119 @@
+import asyncio
+from concurrent.futures import Executor
+from typing import Callable, Generic, List, Optional, Set, Tuple, TypeVar
+
+T = TypeVar('T')
+R = TypeVar('R')
+
+
+class MicroBatcher(Generic[T, R]):
+    """Coalesces concurrent submit() calls into batches for a single process_batch call.
+
+    A batch is dispatched once max_batch_size items are queued or max_wait_ms has
+    passed since its first item. process_batch runs in an executor and must return
+    one result per item, in order. Up to max_concurrent_batches batches run at once,
+    so a slow batch does not hold up the ones queued behind it.
+    """
+
+    def __init__(self, process_batch: Callable[[List[T]], List[R]], max_batch_size: int = 32,
+                 max_wait_ms: float = 2.0, executor: Optional[Executor] = None,
+                 max_concurrent_batches: int = 4):
+        self.process_batch = process_batch
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self.executor = executor
+        self.max_concurrent_batches = max(1, max_concurrent_batches)
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._dispatches: Set[asyncio.Task] = set()
+        self._closed = False
+
+    async def submit(self, item: T) -> R:
+        """Queue an item and wait for its result"""
+        if self._closed:
+            raise RuntimeError("MicroBatcher is closed")
+        if self._worker is None or self._worker.done():
+            self._queue = asyncio.Queue()
+            self._slots = asyncio.Semaphore(self.max_concurrent_batches)
+            self._worker = asyncio.create_task(self._run())
+
+        future = asyncio.get_running_loop().create_future()
+        self._queue.put_nowait((item, future))
+        return await future
+
+    async def close(self):
+        """Stop the background worker and any batches still in flight, failing every waiting caller"""
+        self._closed = True
+        tasks = list(self._dispatches)
+        if self._worker is not None:
+            tasks.append(self._worker)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._dispatches.clear()
+        self._worker = None
+
+        # Items still queued were never picked up by the worker
+        while self._queue is not None and not self._queue.empty():
+            self._fail(self._queue.get_nowait()[1])
+
+    @staticmethod
+    def _fail(future: asyncio.Future):
+        """Resolve a caller's future with the closed error, unless it already has a result"""
+        if not future.done():
+            future.set_exception(RuntimeError("MicroBatcher is closed"))
+
+    async def _run(self):
+        """Collect batches from the queue and dispatch them until cancelled"""
+        loop = asyncio.get_running_loop()
+        batch: List[Tuple[T, asyncio.Future]] = []
+        try:
+            while True:
+                batch = [await self._queue.get()]
+                deadline = loop.time() + self.max_wait
+                while len(batch) < self.max_batch_size:
+                    timeout = deadline - loop.time()
+                    if timeout <= 0:
+                        break
+                    try:
+                        batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                    except asyncio.TimeoutError:
+                        break
+
+                await self._slots.acquire()
+                task = asyncio.create_task(self._dispatch(loop, batch))
+                self._dispatches.add(task)
+                task.add_done_callback(self._dispatch_done)
+                batch = []  # Now owned by the dispatch task
+        except asyncio.CancelledError:
+            # Cancelled by close() while collecting or waiting for a slot
+            for _, future in batch:
+                self._fail(future)
+            raise
+
+    def _dispatch_done(self, task: asyncio.Task):
+        """Free the task's concurrency slot"""
+        self._dispatches.discard(task)
+        self._slots.release()
+
+    async def _dispatch(self, loop: asyncio.AbstractEventLoop, batch: List[Tuple[T, asyncio.Future]]):
+        """Run process_batch for a batch and resolve each caller's future"""
+        try:
+            results = await loop.run_in_executor(self.executor, self.process_batch, [item for item, _ in batch])
+            if len(results) != len(batch):
+                raise ValueError(f"process_batch returned {len(results)} results for {len(batch)} items")
+        except asyncio.CancelledError:
+            # close() stopped the batch; don't leave its callers waiting
+            for _, future in batch:
+                self._fail(future)
+            raise
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        for (_, future), result in zip(batch, results):
+            if not future.done():  # Caller may have been cancelled
+                future.set_result(result)
@@ -1,10 +1,7 @@
-import os
 import hashlib
-import json
+import os
 import re
 import asyncio
-import aiohttp
-import aiofiles
 from pathlib import Path
 from typing import List, Dict, Tuple, Optional
 from dataclasses import dataclass
@@ -15,8 +12,6 @@ import PyPDF2
 import docx
 import markdown
 import requests
-from sentence_transformers import SentenceTransformer
-import faiss
 import numpy as np
 
 
@@ -29,13 +24,26 @@ class DocumentChunk:
     chunk_id: str
     file_hash: str
     metadata: Dict
-    embedding: Optional[np.ndarray] = None
+    embedding: Optional[np.ndarray] = None  # Cleared once stored by the VectorStore
+    row_id: Optional[int] = None  # Row of the embedding in the VectorStore
+    file_type: str = ""  # Lowercase extension of source_file, derived if not given
+    
+    def __post_init__(self):
+        if not self.file_type:
+            self.file_type = get_file_type(self.source_file)
+
+
+def get_file_type(file_path: str) -> str:
+    """Lowercase file extension including the dot (e.g. ".md")"""
+    return os.path.splitext(file_path)[1].lower()
 
 
 class DocumentProcessor:
     """Processes documents from GitHub repos and creates vector embeddings"""
     
     def __init__(self, model_name: str = "all-MiniLM-L6-v2", max_workers: int = 4):
+        # Imported here so modules that only need DocumentChunk don't load torch
+        from sentence_transformers import SentenceTransformer
         self.model = SentenceTransformer(model_name)
         self.chunk_size = 100  # approximate words
         self.overlap = 10  # approximate words
@@ -45,11 +53,9 @@ class DocumentProcessor:
     def extract_text_from_pdf(self, file_path: str) -> str:
         """Extract text from PDF file"""
         try:
-            text = ""
             with open(file_path, 'rb') as file:
                 pdf_reader = PyPDF2.PdfReader(file)
-                for page in pdf_reader.pages:
-                    text += page.extract_text() + "\n"
+                text = "\n".join(page.extract_text() for page in pdf_reader.pages)
             return text.strip()
         except Exception as e:
             print(f"Error extracting PDF {file_path}: {e}")
@@ -59,10 +65,7 @@ class DocumentProcessor:
         """Extract text from Word document"""
         try:
             doc = docx.Document(file_path)
-            text = ""
-            for paragraph in doc.paragraphs:
-                text += paragraph.text + "\n"
-            return text.strip()
+            return "\n".join(paragraph.text for paragraph in doc.paragraphs).strip()
         except Exception as e:
             print(f"Error extracting DOCX {file_path}: {e}")
             return ""
@@ -83,12 +86,9 @@ class DocumentProcessor:
     
     def get_file_hash(self, file_path: str) -> str:
         """Calculate SHA-256 hash of file"""
-        hash_sha256 = hashlib.sha256()
         try:
             with open(file_path, "rb") as f:
-                for chunk in iter(lambda: f.read(4096), b""):
-                    hash_sha256.update(chunk)
-            return hash_sha256.hexdigest()
+                return hashlib.file_digest(f, "sha256").hexdigest()
         except Exception as e:
             print(f"Error hashing file {file_path}: {e}")
             return ""
@@ -104,6 +104,13 @@ class DocumentProcessor:
         current_chunk = ""
         
         file_hash = self.get_file_hash(file_path)
+        file_stem = Path(file_path).stem
+        
+        # Only chunk_index varies between chunks of the same file
+        base_metadata = {
+            "file_type": Path(file_path).suffix,
+            "processed_at": datetime.now().isoformat()
+        }
         
         for i, sentence in enumerate(sentences):
             sentence = sentence.strip()
@@ -114,18 +121,14 @@ class DocumentProcessor:
             approx_words = len(current_chunk.split()) + len(sentence.split())
             if approx_words > self.chunk_size and current_chunk:
                 # Create chunk
-                chunk_id = f"{repo_name}_{Path(file_path).stem}_{len(chunks)}"
+                chunk_id = f"{repo_name}_{file_stem}_{len(chunks)}"
                 chunk = DocumentChunk(
                     content=current_chunk.strip(),
                     source_file=file_path,
                     repo_name=repo_name,
                     chunk_id=chunk_id,
                     file_hash=file_hash,
-                    metadata={
-                        "file_type": Path(file_path).suffix,
-                        "chunk_index": len(chunks),
-                        "processed_at": datetime.now().isoformat()
-                    }
+                    metadata={**base_metadata, "chunk_index": len(chunks)}
                 )
                 chunks.append(chunk)
                 
@@ -137,18 +140,14 @@ class DocumentProcessor:
         
         # Add final chunk if it has content
         if current_chunk.strip():
-            chunk_id = f"{repo_name}_{Path(file_path).stem}_{len(chunks)}"
+            chunk_id = f"{repo_name}_{file_stem}_{len(chunks)}"
             chunk = DocumentChunk(
                 content=current_chunk.strip(),
                 source_file=file_path,
                 repo_name=repo_name,
                 chunk_id=chunk_id,
                 file_hash=file_hash,
-                metadata={
-                    "file_type": Path(file_path).suffix,
-                    "chunk_index": len(chunks),
-                    "processed_at": datetime.now().isoformat()
-                }
+                metadata={**base_metadata, "chunk_index": len(chunks)}
             )
             chunks.append(chunk)
         
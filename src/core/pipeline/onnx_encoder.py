@@ -0,0 +1,65 @@
+from pathlib import Path
+from typing import List, Optional, Union
+
+import numpy as np
+
+try:
+    import onnxruntime as ort
+    from transformers import AutoTokenizer
+    ONNX_AVAILABLE = True
+except ImportError:
+    ONNX_AVAILABLE = False
+
+
+class OnnxEncoder:
+    """Sentence encoder running an exported transformer with ONNX Runtime (mean pooling).
+
+    model_dir holds the ONNX model and its tokenizer, e.g. as produced by
+    `optimum-cli export onnx --model sentence-transformers/all-MiniLM-L6-v2 --optimize O3 <dir>`
+    and optionally INT8-quantized with onnxruntime.quantization.quantize_dynamic.
+    """
+
+    def __init__(self, model_dir: str, model_file: str = "model.onnx", max_length: int = 256,
+                 num_threads: Optional[int] = None, providers: Optional[List[str]] = None):
+        if not ONNX_AVAILABLE:
+            raise ImportError("onnxruntime and transformers are required for OnnxEncoder")
+
+        session_options = ort.SessionOptions()
+        session_options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if num_threads:
+            session_options.intra_op_num_threads = num_threads
+
+        self.max_length = max_length
+        self.tokenizer = AutoTokenizer.from_pretrained(model_dir)
+        self.session = ort.InferenceSession(str(Path(model_dir) / model_file), session_options,
+                                            providers=providers or ["CPUExecutionProvider"])
+        self._input_names = [model_input.name for model_input in self.session.get_inputs()]
+        output_names = [output.name for output in self.session.get_outputs()]
+        self._output_name = "last_hidden_state" if "last_hidden_state" in output_names else output_names[0]
+
+    def encode(self, sentences: Union[str, List[str]], batch_size: int = 32,
+               normalize_embeddings: bool = False, **kwargs) -> np.ndarray:
+        """Encode one sentence or a list of sentences (SentenceTransformer.encode compatible)"""
+        single = isinstance(sentences, str)
+        if single:
+            sentences = [sentences]
+
+        batches = []
+        for start in range(0, len(sentences), batch_size):
+            tokens = self.tokenizer(sentences[start:start + batch_size], padding=True, truncation=True,
+                                    max_length=self.max_length, return_tensors="np")
+            attention_mask = tokens["attention_mask"]
+            inputs = {
+                name: tokens[name].astype(np.int64) if name in tokens else np.zeros_like(attention_mask, dtype=np.int64)
+                for name in self._input_names
+            }
+            hidden = self.session.run([self._output_name], inputs)[0]
+
+            # Mean over real (non-padding) tokens
+            mask = attention_mask[..., None].astype(np.float32)
+            batches.append((hidden * mask).sum(axis=1) / np.clip(mask.sum(axis=1), 1e-9, None))
+
+        embeddings = np.concatenate(batches).astype(np.float32)
+        if normalize_embeddings:
+            embeddings /= np.clip(np.linalg.norm(embeddings, axis=1, keepdims=True), 1e-12, None)
+        return embeddings[0] if single else embeddings
@@ -11,6 +11,7 @@ import yaml
 import json
 import logging
 import asyncio
+import aiohttp
 from pathlib import Path
 from typing import List, Dict, Optional
 from datetime import datetime
@@ -74,9 +75,10 @@ def should_process_repo(repo_config: Dict, target_repos: List[str]) -> bool:
 
 
 async def process_repository(repo_config: Dict, processor: DocumentProcessor, 
-                      vector_store: VectorStore, force_rebuild: bool = False,
+                      vector_store: VectorStore, session: aiohttp.ClientSession,
+                      force_rebuild: bool = False,
                       github_token: str|None = None) -> Dict:
-    """Process a single repository asynchronously"""
+    """Process a single repository asynchronously using the shared HTTP session"""
     logger = logging.getLogger(__name__)
     
     repo_name = repo_config['name']
@@ -117,13 +119,11 @@ async def process_repository(repo_config: Dict, processor: DocumentProcessor,
                 batch_files = files[i:i + batch_size]
                 
                 # Download batch and check for changes
-                import aiohttp
-                async with aiohttp.ClientSession() as session:
-                    download_tasks = [
-                        processor.download_file_from_github_async(session, repo_url, file_path, github_token)
-                        for file_path in batch_files
-                    ]
-                    local_files = await asyncio.gather(*download_tasks, return_exceptions=True)
+                download_tasks = [
+                    processor.download_file_from_github_async(session, repo_url, file_path, github_token)
+                    for file_path in batch_files
+                ]
+                local_files = await asyncio.gather(*download_tasks, return_exceptions=True)
                 
                 # Process each file if it changed
                 processing_tasks = []
@@ -204,7 +204,14 @@ async def main_async():
         model_name=settings.get('model_name', 'all-MiniLM-L6-v2'),
         max_workers=args.max_workers
     )
-    vector_store = VectorStore()
+    vector_db_settings = settings.get('vector_db', {})
+    vector_store = VectorStore(
+        index_type=vector_db_settings.get('index_type', 'auto'),
+        nprobe=vector_db_settings.get('nprobe', 8),
+        quantize=vector_db_settings.get('quantize', False),
+        use_gpu=vector_db_settings.get('use_gpu', False),
+        pq_m=vector_db_settings.get('pq_m', 32)
+    )
     
     # Get GitHub token
     github_token = os.getenv('GITHUB_TOKEN')
@@ -232,36 +239,40 @@ async def main_async():
         'repo_results': []
     }
     
-    # Process repos in batches to control resource usage
+    # Process repos in batches to control resource usage. The processor's
+    # executor and a single HTTP session are shared across all repositories.
     batch_size = args.max_concurrent_repos
-    for i in range(0, len(repos_to_process), batch_size):
-        batch_repos = repos_to_process[i:i + batch_size]
-        logger.info(f"Processing repository batch {i//batch_size + 1}/{(len(repos_to_process) + batch_size - 1)//batch_size}")
-        
-        # Process batch concurrently
-        batch_tasks = [
-            process_repository(repo_config, processor, vector_store, args.force_rebuild, github_token)
-            for repo_config in batch_repos
-        ]
-        
-        batch_results = await asyncio.gather(*batch_tasks, return_exceptions=True)
-        
-        # Aggregate results
-        for result in batch_results:
-            if isinstance(result, dict):
-                total_results['repositories_processed'] += 1
-                total_results['total_files_processed'] += result['files_processed']
-                total_results['total_chunks_added'] += result['chunks_added']
-                total_results['total_files_updated'] += result['files_updated']
-                total_results['total_files_skipped'] += result['files_skipped']
-                total_results['total_errors'] += len(result['errors'])
-                total_results['repo_results'].append(result)
-            elif isinstance(result, Exception):
-                logger.error(f"Repository processing failed: {result}")
-                total_results['total_errors'] += 1
-    
-    # Clean up
-    processor.executor.shutdown(wait=True)
+    try:
+        async with aiohttp.ClientSession() as session:
+            for i in range(0, len(repos_to_process), batch_size):
+                batch_repos = repos_to_process[i:i + batch_size]
+                logger.info(f"Processing repository batch {i//batch_size + 1}/{(len(repos_to_process) + batch_size - 1)//batch_size}")
+                
+                # Process batch concurrently
+                batch_tasks = [
+                    process_repository(repo_config, processor, vector_store, session,
+                                       args.force_rebuild, github_token)
+                    for repo_config in batch_repos
+                ]
+                
+                batch_results = await asyncio.gather(*batch_tasks, return_exceptions=True)
+                
+                # Aggregate results
+                for result in batch_results:
+                    if isinstance(result, dict):
+                        total_results['repositories_processed'] += 1
+                        total_results['total_files_processed'] += result['files_processed']
+                        total_results['total_chunks_added'] += result['chunks_added']
+                        total_results['total_files_updated'] += result['files_updated']
+                        total_results['total_files_skipped'] += result['files_skipped']
+                        total_results['total_errors'] += len(result['errors'])
+                        total_results['repo_results'].append(result)
+                    elif isinstance(result, Exception):
+                        logger.error(f"Repository processing failed: {result}")
+                        total_results['total_errors'] += 1
+    finally:
+        # Clean up once, after every repository has completed
+        processor.executor.shutdown(wait=True)
     
     # Save updated vector store
     logger.info("Saving vector database...")
@@ -1,51 +1,304 @@
 import os
 import json
 import pickle
+import bisect
+import threading
+from collections import Counter, OrderedDict
 from pathlib import Path
-from typing import List, Dict, Tuple, Optional
+from typing import Callable, Iterator, List, Dict, Tuple, Optional
 import numpy as np
 import faiss
+import orjson
+import pyarrow as pa
+import pyarrow.compute as pc
 from datetime import datetime
 
-from doc_processor import DocumentChunk
+from .doc_processor import DocumentChunk, get_file_type
+
+try:
+    from numba import njit, prange
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+# Below this many rows faiss.normalize_L2 is faster than the JIT kernel
+NUMBA_NORMALIZE_MIN_ROWS = 1024
+
+if NUMBA_AVAILABLE:
+    @njit(fastmath=True, parallel=True, cache=True)
+    def _normalize_rows_jit(x):
+        """L2-normalize each row of a 2D float32 array in place"""
+        for i in prange(x.shape[0]):
+            norm_sq = np.float32(0.0)
+            for j in range(x.shape[1]):
+                norm_sq += x[i, j] * x[i, j]
+            if norm_sq > 0:
+                inv_norm = np.float32(1.0) / np.sqrt(norm_sq)
+                for j in range(x.shape[1]):
+                    x[i, j] *= inv_norm
+
+
+def normalize_rows(x: np.ndarray):
+    """L2-normalize the rows of a contiguous float32 array in place"""
+    if NUMBA_AVAILABLE and x.shape[0] >= NUMBA_NORMALIZE_MIN_ROWS:
+        _normalize_rows_jit(x)
+    else:
+        faiss.normalize_L2(x)
+
+
+# Indexes storing lossy codes, whose results are rescored with the float32 vectors
+QUANTIZED_INDEX_TYPES = (faiss.IndexIVFScalarQuantizer, faiss.IndexIVFPQFastScan)
+
+# Upper bound (unless more clusters need it) on vectors used to train IVF indexes
+TRAIN_SAMPLE_SIZE = 50000
+
+# Filter combinations whose id bitmaps are kept (least recently used are dropped first)
+SELECTOR_CACHE_SIZE = 64
+
+
+# Columnar on-disk layout of DocumentChunks; table row i is chunk row_id i and
+# deleted chunks are all-null rows. Embeddings are stored separately.
+CHUNK_SCHEMA = pa.schema([
+    ("content", pa.string()),
+    ("source_file", pa.string()),
+    ("repo_name", pa.string()),
+    ("chunk_id", pa.string()),
+    ("file_hash", pa.string()),
+    ("metadata", pa.string()),  # JSON encoded
+    ("file_type", pa.string()),
+])
+
+
+class ChunkView:
+    """List-like view of DocumentChunks backed by an Arrow table, built row by row on access.
+    
+    Rows of the table can only be tombstoned (set to None); chunks added since
+    the table was loaded are held in memory until the next save.
+    """
+    
+    def __init__(self, table: Optional[pa.Table] = None, chunks: Optional[List[Optional[DocumentChunk]]] = None):
+        if table is None:
+            table = CHUNK_SCHEMA.empty_table()
+        elif "file_type" not in table.schema.names:
+            # Tables written before file_type was stored
+            table = table.append_column("file_type", pa.array(
+                [get_file_type(source_file) if source_file is not None else None
+                 for source_file in table.column("source_file").to_pylist()],
+                type=pa.string()
+            ))
+        self._table = table
+        self._table_rows = self._table.num_rows
+        self._deleted = set()  # Tombstoned table rows
+        self._appended = list(chunks or [])
+    
+    def __len__(self) -> int:
+        return self._table_rows + len(self._appended)
+    
+    def __getitem__(self, row_id: int) -> Optional[DocumentChunk]:
+        if row_id < 0 or row_id >= len(self):
+            raise IndexError(f"Chunk row {row_id} out of range")
+        if row_id >= self._table_rows:
+            return self._appended[row_id - self._table_rows]
+        if row_id in self._deleted:
+            return None
+        return self._chunk_from_row(self._table.slice(row_id, 1).to_pylist()[0], row_id)
+    
+    def get_many(self, row_ids: List[int]) -> List[Optional[DocumentChunk]]:
+        """Chunks for many rows, reading all table rows with a single columnar take"""
+        table_row_ids = [row_id for row_id in row_ids if row_id < self._table_rows and row_id not in self._deleted]
+        table_rows = dict(zip(
+            table_row_ids,
+            self._table.take(pa.array(table_row_ids, type=pa.int64())).to_pylist()
+        ))
+        
+        chunks = []
+        for row_id in row_ids:
+            if row_id >= self._table_rows:
+                chunks.append(self._appended[row_id - self._table_rows])
+            elif row_id in table_rows:
+                chunks.append(self._chunk_from_row(table_rows[row_id], row_id))
+            else:
+                chunks.append(None)
+        return chunks
+    
+    @staticmethod
+    def _chunk_from_row(row: Dict, row_id: int) -> Optional[DocumentChunk]:
+        """DocumentChunk for a table row dict (None for tombstoned rows)"""
+        if row["chunk_id"] is None:
+            return None
+        return DocumentChunk(
+            content=row["content"],
+            source_file=row["source_file"],
+            repo_name=row["repo_name"],
+            chunk_id=row["chunk_id"],
+            file_hash=row["file_hash"],
+            metadata=json.loads(row["metadata"]),
+            row_id=row_id,
+            file_type=row["file_type"]
+        )
+    
+    def __setitem__(self, row_id: int, chunk: Optional[DocumentChunk]):
+        if row_id < 0 or row_id >= len(self):
+            raise IndexError(f"Chunk row {row_id} out of range")
+        if row_id >= self._table_rows:
+            self._appended[row_id - self._table_rows] = chunk
+        elif chunk is None:
+            self._deleted.add(row_id)
+        else:
+            raise ValueError("Chunks stored in the table can only be removed, not replaced")
+    
+    def __iter__(self) -> Iterator[Optional[DocumentChunk]]:
+        for row_id in range(len(self)):
+            yield self[row_id]
+    
+    def extend(self, chunks: List[DocumentChunk]):
+        self._appended.extend(chunks)
+    
+    def live_files(self) -> Iterator[Tuple[int, str, str]]:
+        """Yield (row_id, repo_name, source_file) for every live chunk without building chunks"""
+        repo_names = self._table.column("repo_name").to_pylist()
+        source_files = self._table.column("source_file").to_pylist()
+        stored = pc.is_valid(self._table.column("chunk_id")).to_numpy(zero_copy_only=False)
+        for row_id in np.flatnonzero(stored).tolist():
+            if row_id not in self._deleted:
+                yield row_id, repo_names[row_id], source_files[row_id]
+        for row_id, chunk in enumerate(self._appended, start=self._table_rows):
+            if chunk is not None:
+                yield row_id, chunk.repo_name, chunk.source_file
+    
+    def take(self, row_ids: List[int]) -> "ChunkView":
+        """New view holding only the given (sorted) rows, renumbered from zero"""
+        split = bisect.bisect_left(row_ids, self._table_rows)
+        table = self._table.take(pa.array(row_ids[:split], type=pa.int64()))
+        appended = [self._appended[row_id - self._table_rows] for row_id in row_ids[split:]]
+        for row_id, chunk in enumerate(appended, start=split):
+            chunk.row_id = row_id
+        return ChunkView(table, appended)
+    
+    def to_table(self) -> pa.Table:
+        """Arrow table of all rows, with tombstoned rows as nulls"""
+        table = self._table
+        if self._deleted:
+            deleted = np.zeros(self._table_rows, dtype=bool)
+            deleted[list(self._deleted)] = True
+            mask = pa.array(deleted)
+            table = pa.table(
+                [pc.if_else(mask, pa.scalar(None, field.type), table.column(field.name)) for field in CHUNK_SCHEMA],
+                schema=CHUNK_SCHEMA
+            )
+        
+        columns = {name: [None] * len(self._appended) for name in CHUNK_SCHEMA.names}
+        for row, chunk in enumerate(self._appended):
+            if chunk is None:
+                continue
+            columns["content"][row] = chunk.content
+            columns["source_file"][row] = chunk.source_file
+            columns["repo_name"][row] = chunk.repo_name
+            columns["chunk_id"][row] = chunk.chunk_id
+            columns["file_hash"][row] = chunk.file_hash
+            columns["metadata"][row] = json.dumps(chunk.metadata)
+            columns["file_type"][row] = chunk.file_type
+        return pa.concat_tables([table, pa.table(columns, schema=CHUNK_SCHEMA)])
 
 
 class VectorStore:
     """Manages FAISS vector database for document search"""
     
-    def __init__(self, index_path: str = "data/faiss_index", metadata_path: str = "data/metadata.json"):
+    def __init__(self, index_path: str = "data/faiss_index", metadata_path: str = "data/metadata.json",
+                 index_type: str = "auto", nprobe: int = 8, ivf_min_vectors: int = 4096,
+                 quantize: bool = False, rebuild_threshold: float = 0.5, use_gpu: bool = False,
+                 pq_m: int = 32, rescore_factor: int = 4, mmap: bool = False):
         self.index_path = Path(index_path)
         self.metadata_path = Path(metadata_path)
         self.index_file = self.index_path / "index.faiss"
-        self.chunks_file = self.index_path / "chunks.pkl"
+        self.chunks_file = self.index_path / "chunks.arrow"
+        self.legacy_chunks_file = self.index_path / "chunks.pkl"
+        self.embeddings_file = self.index_path / "embeddings.f32"
+        # Compacted embeddings are written here and moved over embeddings_file by the next save
+        self.new_embeddings_file = self.index_path / "embeddings.f32.new"
+        
+        # Index settings: "flat" (exact), "ivf"/"auto" (approximate) or "ivfpq"
+        # (ivf with pq_m 4-bit PQ codes per vector searched by FastScan kernels).
+        # Approximate indexes start flat and are promoted once the store holds
+        # ivf_min_vectors vectors, training on everything stored by then.
+        # With quantize, ivf indexes store 8-bit scalar-quantized codes instead
+        # of float32 vectors.
+        self.index_type = index_type
+        self.nprobe = nprobe
+        self.ivf_min_vectors = ivf_min_vectors
+        self.quantize = quantize
+        self.pq_m = pq_m
+        
+        # Quantized indexes fetch rescore_factor * k candidates and re-rank them
+        # by exact score against the stored float32 embeddings (1 disables)
+        self.rescore_factor = rescore_factor
+        
+        # Search-only processes can memory-map the index and embeddings read-only,
+        # so loading is near-instant and workers share the OS page cache
+        self.mmap = mmap
+        
+        # With use_gpu (and a GPU available) searches run against a GPU copy of
+        # the index; adds, removals and saves always work on the CPU index
+        self.use_gpu = use_gpu and hasattr(faiss, "get_num_gpus") and faiss.get_num_gpus() > 0
+        self._gpu_resources = None
+        self._gpu_index = None
+        
+        # Removed chunks are tombstoned (None) and their vectors removed by id;
+        # the index is only compacted once this fraction of rows is deleted
+        self.rebuild_threshold = rebuild_threshold
+        self._deleted_count = 0
         
         # Create directories if they don't exist
         self.index_path.mkdir(parents=True, exist_ok=True)
         
         # Initialize or load existing index
         self.index = None
-        self.chunks = []  # List of DocumentChunk objects
+        self.chunks = ChunkView()  # DocumentChunk objects indexed by FAISS id (None = deleted)
         self.metadata = {}
         
+        # Normalized embeddings as one contiguous (capacity, dim) float32 array;
+        # row i belongs to self.chunks[i]. Backed by embeddings_file, or by
+        # new_embeddings_file after a compaction that has not been saved yet.
+        self._embeddings: Optional[np.memmap] = None
+        self._embeddings_backing_file = self.embeddings_file
+        
+        # (repo_name, source_file) -> row ids of that file's live chunks
+        self._file_index: Dict[Tuple[str, str], List[int]] = {}
+        
+        # (repos, file types) filter -> FAISS selector over an id bitmap, or None if nothing matches;
+        # filters come from requests, so only the SELECTOR_CACHE_SIZE most recent are kept
+        self._selector_cache: "OrderedDict[Tuple[frozenset, frozenset], Optional[faiss.IDSelector]]" = OrderedDict()
+        self._selector_lock = threading.Lock()  # Searches run on executor threads
+        
         self.load_index()
     
     def load_index(self):
         """Load existing FAISS index and metadata"""
+        self._invalidate_search_caches()
         try:
             if self.index_file.exists():
-                self.index = faiss.read_index(str(self.index_file))
+                io_flags = faiss.IO_FLAG_MMAP | faiss.IO_FLAG_READ_ONLY if self.mmap else 0
+                self.index = faiss.read_index(str(self.index_file), io_flags)
                 print(f"Loaded FAISS index with {self.index.ntotal} vectors")
             else:
                 print("No existing index found, will create new one")
                 
+            # The chunks table stays memory-mapped; chunks are built on access
+            legacy_chunks = False
             if self.chunks_file.exists():
-                with open(self.chunks_file, 'rb') as f:
-                    self.chunks = pickle.load(f)
-                print(f"Loaded {len(self.chunks)} document chunks")
+                self.chunks = ChunkView(pa.ipc.open_file(pa.memory_map(str(self.chunks_file), 'r')).read_all())
+            elif self.legacy_chunks_file.exists():
+                with open(self.legacy_chunks_file, 'rb') as f:
+                    self.chunks = ChunkView(chunks=pickle.load(f))
+                legacy_chunks = True
+            
+            self._build_file_index()
+            if self.chunks:
+                self._deleted_count = len(self.chunks) - sum(len(rows) for rows in self._file_index.values())
+                print(f"Loaded {len(self.chunks) - self._deleted_count} document chunks")
             
             if self.metadata_path.exists():
-                with open(self.metadata_path, 'r') as f:
-                    self.metadata = json.load(f)
+                self.metadata = orjson.loads(self.metadata_path.read_bytes())
                 print(f"Loaded metadata for {len(self.metadata.get('files', {}))} files")
             else:
                 self.metadata = {
@@ -55,33 +308,95 @@ class VectorStore:
                     "files": {},
                     "repos": {}
                 }
+            
+            # Left over from a compaction that was never saved
+            self._embeddings_backing_file = self.embeddings_file
+            if not self.mmap:
+                self.new_embeddings_file.unlink(missing_ok=True)
+            
+            embedding_dim = self.metadata.get("embedding_dim")
+            if embedding_dim and self.embeddings_file.exists():
+                capacity = self.embeddings_file.stat().st_size // (embedding_dim * np.dtype(np.float32).itemsize)
+                self._embeddings = np.memmap(self.embeddings_file, dtype=np.float32,
+                                             mode="r" if self.mmap else "r+", shape=(capacity, embedding_dim))
+            
+            # Chunks saved with inline embeddings are moved into the embeddings file
+            if legacy_chunks and not self.mmap and self._migrate_inline_embeddings():
+                self._build_file_index()
+                self._rebuild_index()
                 
         except Exception as e:
             print(f"Error loading index: {e}")
             self.index = None
-            self.chunks = []
+            self.chunks = ChunkView()
             self.metadata = {}
+            self._embeddings = None
+            self._file_index = {}
     
     def save_index(self):
         """Save FAISS index and metadata to disk"""
+        # Every file is fully written to a temporary path first and only then
+        # renamed over the old ones, so a crash mid-save never leaves a
+        # truncated file behind or a new file next to old ones it doesn't match
+        staged: List[Tuple[Path, Path]] = []
         try:
             if self.index is not None:
-                faiss.write_index(self.index, str(self.index_file))
-                print(f"Saved FAISS index with {self.index.ntotal} vectors")
+                self._stage_file(staged, self.index_file, lambda path: faiss.write_index(self.index, str(path)))
+            
+            table = self.chunks.to_table()
+            
+            def write_chunks(path: Path):
+                with pa.OSFile(str(path), 'wb') as sink:
+                    with pa.ipc.new_file(sink, CHUNK_SCHEMA) as writer:
+                        writer.write_table(table)
             
-            with open(self.chunks_file, 'wb') as f:
-                pickle.dump(self.chunks, f)
-            print(f"Saved {len(self.chunks)} document chunks")
+            self._stage_file(staged, self.chunks_file, write_chunks)
             
             self.metadata["last_updated"] = datetime.now().isoformat()
-            self.metadata["total_chunks"] = len(self.chunks)
+            self.metadata["total_chunks"] = self.live_chunk_count
             
-            with open(self.metadata_path, 'w') as f:
-                json.dump(self.metadata, f, indent=2)
+            self._stage_file(
+                staged, self.metadata_path,
+                lambda path: path.write_bytes(orjson.dumps(self.metadata, option=orjson.OPT_INDENT_2))
+            )
+            
+            if self._embeddings is not None:
+                self._embeddings.flush()
+            
+            # Compacted embeddings already live in their own file; it is moved
+            # into place first (the open memmap follows the renamed file). If
+            # the store was emptied and nothing added since, there is no new
+            # file and the saved rows are all deleted.
+            if self._embeddings_backing_file != self.embeddings_file:
+                if self._embeddings_backing_file.exists():
+                    os.replace(self._embeddings_backing_file, self.embeddings_file)
+                else:
+                    self.embeddings_file.unlink(missing_ok=True)
+                self._embeddings_backing_file = self.embeddings_file
+            
+            for tmp_path, path in staged:
+                os.replace(tmp_path, path)
+            if self.index is None:
+                self.index_file.unlink(missing_ok=True)  # Would bring the deleted vectors back
+            self.legacy_chunks_file.unlink(missing_ok=True)
+            
+            if self.index is not None:
+                print(f"Saved FAISS index with {self.index.ntotal} vectors")
+            print(f"Saved {self.live_chunk_count} document chunks")
             print("Saved metadata")
             
         except Exception as e:
             print(f"Error saving index: {e}")
+        finally:
+            for tmp_path, _ in staged:
+                tmp_path.unlink(missing_ok=True)
+    
+    @staticmethod
+    def _stage_file(staged: List[Tuple[Path, Path]], path: Path, write: Callable[[Path], None]):
+        """Write a file via write(tmp_path), recording (tmp_path, path) to be moved into place"""
+        tmp_path = path.with_name(path.name + ".tmp")
+        staged.append((tmp_path, path))
+        write(tmp_path)
     
     def add_chunks(self, chunks: List[DocumentChunk]):
         """Add new document chunks to the vector store"""
@@ -94,70 +409,99 @@ class VectorStore:
             print("No valid chunks with embeddings to add")
             return
         
-        # Extract embeddings
-        embeddings = np.array([chunk.embedding for chunk in valid_chunks])
-        embedding_dim = embeddings.shape[1]
+        # Copy embeddings straight into their rows of the embeddings file, using
+        # each chunk's position in self.chunks as its row and FAISS id
+        start_id = len(self.chunks)
+        end_id = start_id + len(valid_chunks)
+        self._ensure_capacity(end_id, len(valid_chunks[0].embedding))
+        embeddings = self._embeddings[start_id:end_id]
+        for row, chunk in enumerate(valid_chunks):
+            embeddings[row] = chunk.embedding
+            chunk.row_id = start_id + row
+            chunk.embedding = None
+            self._file_index.setdefault((chunk.repo_name, chunk.source_file), []).append(chunk.row_id)
+        
+        # Normalize embeddings for cosine similarity (stored normalized)
+        normalize_rows(embeddings)
         
         # Initialize index if it doesn't exist
         if self.index is None:
-            self.index = faiss.IndexFlatIP(embedding_dim)  # Inner product for cosine similarity
-            print(f"Created new FAISS index with dimension {embedding_dim}")
-        
-        # Normalize embeddings for cosine similarity
-        faiss.normalize_L2(embeddings)
+            self.index = self._create_index(embeddings)
         
         # Add to index
-        self.index.add(embeddings)
+        self.index.add_with_ids(embeddings, np.arange(start_id, end_id, dtype=np.int64))
+        self._invalidate_search_caches()
         
         # Add chunks to our list
         self.chunks.extend(valid_chunks)
         
-        # Update metadata
-        for chunk in valid_chunks:
-            file_key = f"{chunk.repo_name}/{chunk.source_file}"
+        # Chunks arrive one file at a time, so a flat index is replaced by an
+        # IVF one (trained on all stored vectors) once the store is large enough
+        if self._should_promote():
+            print(f"Promoting flat index to {self.index_type} at {self.index.ntotal} vectors")
+            self._rebuild_index()
+        
+        # Update metadata once per file rather than once per chunk
+        chunk_counts = Counter((chunk.repo_name, chunk.source_file) for chunk in valid_chunks)
+        last_chunks = {(chunk.repo_name, chunk.source_file): chunk for chunk in valid_chunks}
+        for (repo_name, source_file), count in chunk_counts.items():
+            chunk = last_chunks[(repo_name, source_file)]
+            file_key = f"{repo_name}/{source_file}"
             self.metadata["files"][file_key] = {
                 "file_hash": chunk.file_hash,
                 "processed_at": chunk.metadata.get("processed_at"),
-                "chunk_count": self.metadata["files"].get(file_key, {}).get("chunk_count", 0) + 1
+                "chunk_count": self.metadata["files"].get(file_key, {}).get("chunk_count", 0) + count
             }
             
-            if chunk.repo_name not in self.metadata["repos"]:
-                self.metadata["repos"][chunk.repo_name] = {
+            if repo_name not in self.metadata["repos"]:
+                self.metadata["repos"][repo_name] = {
                     "files": [],
                     "total_chunks": 0
                 }
             
-            repo_files = self.metadata["repos"][chunk.repo_name]["files"]
-            if chunk.source_file not in repo_files:
-                repo_files.append(chunk.source_file)
+            repo_files = self.metadata["repos"][repo_name]["files"]
+            if source_file not in repo_files:
+                repo_files.append(source_file)
             
-            self.metadata["repos"][chunk.repo_name]["total_chunks"] += 1
+            self.metadata["repos"][repo_name]["total_chunks"] += count
         
         print(f"Added {len(valid_chunks)} chunks to vector store")
     
+    @property
+    def live_chunk_count(self) -> int:
+        """Number of chunks that have not been removed"""
+        return len(self.chunks) - self._deleted_count
+    
     def update_file(self, file_path: str, repo_name: str, new_chunks: List[DocumentChunk]):
         """Update chunks for a specific file (remove old, add new)"""
         file_key = f"{repo_name}/{file_path}"
         
         # Find existing chunks for this file
-        chunks_to_keep = []
-        removed_count = 0
-        
-        for chunk in self.chunks:
-            if chunk.source_file == file_path and chunk.repo_name == repo_name:
-                removed_count += 1
-                continue  # Skip this chunk (remove it)
-            chunks_to_keep.append(chunk)
-        
-        if removed_count > 0:
-            print(f"Removing {removed_count} old chunks for {file_key}")
-            self.chunks = chunks_to_keep
+        ids_to_remove = self._file_index.pop((repo_name, file_path), [])
+        
+        if ids_to_remove:
+            print(f"Removing {len(ids_to_remove)} old chunks for {file_key}")
+            self.index.remove_ids(np.array(ids_to_remove, dtype=np.int64))
+            self._invalidate_search_caches()
+            for chunk_id in ids_to_remove:
+                self.chunks[chunk_id] = None
+            self._deleted_count += len(ids_to_remove)
             
-            # Only rebuild if we have chunks remaining, otherwise add will create new index
-            if self.chunks:
-                self._rebuild_index()
-            else:
+            # Forget the old file so add_chunks counts the new chunks from zero
+            self.metadata["files"].pop(file_key, None)
+            if repo_name in self.metadata["repos"]:
+                self.metadata["repos"][repo_name]["total_chunks"] -= len(ids_to_remove)
+            
+            # Compact only once enough of the index is tombstoned
+            if self.live_chunk_count == 0:
                 self.index = None
+                self.chunks = ChunkView()
+                self._deleted_count = 0
+                # Start a new embeddings file rather than overwriting saved rows
+                self._embeddings = None
+                self._embeddings_backing_file = self.new_embeddings_file
+            elif self._deleted_count / len(self.chunks) > self.rebuild_threshold:
+                self._rebuild_index()
         
         # Add new chunks
         self.add_chunks(new_chunks)
@@ -165,42 +509,292 @@ class VectorStore:
         print(f"Updated {file_key} with {len(new_chunks)} new chunks")
     
     def _rebuild_index(self):
-        """Rebuild the FAISS index from current chunks"""
+        """Rebuild the FAISS index from current chunks, dropping deleted ones"""
+        self._invalidate_search_caches()
+        live_rows = sorted(row_id for rows in self._file_index.values() for row_id in rows)
+        self.chunks = self.chunks.take(live_rows)
+        self._deleted_count = 0
         if not self.chunks:
             self.index = None
+            self._file_index = {}
             return
         
-        embeddings = np.array([chunk.embedding for chunk in self.chunks if chunk.embedding is not None])
-        if len(embeddings) == 0:
-            self.index = None
-            return
+        # Compact the live rows into a new embeddings file, leaving the saved
+        # one (and any process reading it) untouched until save_index
+        num_live = len(live_rows)
+        if live_rows[-1] + 1 != num_live and self._embeddings_backing_file == self.new_embeddings_file:
+            self._embeddings[:num_live] = self._embeddings[live_rows]  # Not saved yet, safe to compact in place
+        elif live_rows[-1] + 1 != num_live:
+            compacted = self._open_embeddings(self.new_embeddings_file, self._embeddings.shape[0],
+                                              self._embeddings.shape[1])
+            compacted[:num_live] = self._embeddings[live_rows]
+            self._embeddings = compacted
+            self._embeddings_backing_file = self.new_embeddings_file
+        self._build_file_index()
         
-        embedding_dim = embeddings.shape[1]
-        self.index = faiss.IndexFlatIP(embedding_dim)
-        faiss.normalize_L2(embeddings)
-        self.index.add(embeddings)
+        # Stored embeddings are already normalized
+        embeddings = self._embeddings[:num_live]
+        self.index = self._create_index(embeddings)
+        self.index.add_with_ids(embeddings, np.arange(len(self.chunks), dtype=np.int64))
         
         print(f"Rebuilt index with {len(embeddings)} vectors")
     
-    def search(self, query_embedding: np.ndarray, k: int = 5) -> List[Tuple[DocumentChunk, float]]:
-        """Search for similar document chunks"""
-        if self.index is None or len(self.chunks) == 0:
-            return []
+    def _build_file_index(self):
+        """Rebuild the (repo_name, source_file) -> row ids map from self.chunks"""
+        self._file_index = {}
+        for row_id, repo_name, source_file in self.chunks.live_files():
+            self._file_index.setdefault((repo_name, source_file), []).append(row_id)
+    
+    def _ensure_capacity(self, rows: int, embedding_dim: int):
+        """Grow the embeddings file (doubling) so it can hold at least `rows` rows"""
+        capacity = 0 if self._embeddings is None else self._embeddings.shape[0]
+        if rows <= capacity:
+            return
+        
+        capacity = max(rows, 2 * capacity, 1024)
+        if self._embeddings is not None:
+            self._embeddings.flush()
+            self._embeddings = None
+        
+        self._embeddings = self._open_embeddings(self._embeddings_backing_file, capacity, embedding_dim)
+        self.metadata["embedding_dim"] = embedding_dim
+    
+    @staticmethod
+    def _open_embeddings(path: Path, capacity: int, embedding_dim: int) -> np.memmap:
+        """Memory-map `path` as a writable (capacity, embedding_dim) float32 array, sizing the file to fit"""
+        path.touch()
+        os.truncate(path, capacity * embedding_dim * np.dtype(np.float32).itemsize)
+        return np.memmap(path, dtype=np.float32, mode="r+", shape=(capacity, embedding_dim))
+    
+    def _migrate_inline_embeddings(self) -> bool:
+        """Move (and normalize) embeddings pickled on chunks by older versions into the embeddings file"""
+        inline_rows = [row_id for row_id, chunk in enumerate(self.chunks)
+                       if chunk is not None and chunk.row_id is None]
+        if not inline_rows:
+            return False
+        
+        migrated_rows = []
+        for row_id in inline_rows:
+            chunk = self.chunks[row_id]
+            if chunk.embedding is None:
+                self.chunks[row_id] = None
+                self._deleted_count += 1
+                continue
+            
+            self._ensure_capacity(len(self.chunks), len(chunk.embedding))
+            self._embeddings[row_id] = chunk.embedding
+            chunk.row_id = row_id
+            chunk.embedding = None
+            chunk.file_type = get_file_type(chunk.source_file)
+            migrated_rows.append(row_id)
+        
+        if migrated_rows:
+            migrated = self._embeddings[migrated_rows]
+            normalize_rows(migrated)
+            self._embeddings[migrated_rows] = migrated
+        
+        print(f"Migrated {len(inline_rows)} inline chunk embeddings")
+        return True
+    
+    def _should_promote(self) -> bool:
+        """Whether the index is flat but the store has grown enough for the configured IVF index"""
+        return (self.index_type in ("ivf", "auto", "ivfpq")
+                and faiss.try_extract_index_ivf(self.index) is None
+                and self.index.ntotal >= self.ivf_min_vectors)
+    
+    def _create_index(self, embeddings: np.ndarray) -> faiss.Index:
+        """Create an empty index supporting add_with_ids/remove_ids, training it if needed"""
+        num_vectors, embedding_dim = embeddings.shape
+        use_ivf = self.index_type in ("ivf", "auto", "ivfpq") and num_vectors >= self.ivf_min_vectors
         
-        # Normalize query embedding
-        query_embedding = query_embedding.reshape(1, -1)
-        faiss.normalize_L2(query_embedding)
+        if not use_ivf:
+            print(f"Created new flat FAISS index with dimension {embedding_dim}")
+            return faiss.IndexIDMap2(faiss.IndexFlatIP(embedding_dim))  # Inner product for cosine similarity
         
-        # Search
-        scores, indices = self.index.search(query_embedding, min(k, len(self.chunks)))
+        # Inverted file index: ~sqrt(N) clusters, trained on the stored vectors.
+        # IVF indexes store ids natively, so they are not wrapped in an IDMap.
+        nlist = max(1, int(np.sqrt(num_vectors)))
+        quantizer = faiss.IndexFlatIP(embedding_dim)
+        if self.index_type == "ivfpq":
+            # 4-bit PQ codes scanned with SIMD lookup-table kernels (FastScan)
+            pq_m = max(m for m in range(1, min(self.pq_m, embedding_dim) + 1) if embedding_dim % m == 0)
+            index = faiss.IndexIVFPQFastScan(quantizer, embedding_dim, nlist, pq_m, 4,
+                                             faiss.METRIC_INNER_PRODUCT)
+        elif self.quantize:
+            index = faiss.IndexIVFScalarQuantizer(quantizer, embedding_dim, nlist,
+                                                  faiss.ScalarQuantizer.QT_8bit,
+                                                  faiss.METRIC_INNER_PRODUCT)
+        else:
+            index = faiss.IndexIVFFlat(quantizer, embedding_dim, nlist, faiss.METRIC_INNER_PRODUCT)
+        index.train(self._training_sample(embeddings, nlist))
+        print(f"Created new {type(index).__name__} FAISS index with dimension {embedding_dim} and {nlist} lists")
+        return index
+    
+    @staticmethod
+    def _training_sample(embeddings: np.ndarray, nlist: int) -> np.ndarray:
+        """Random subset of embeddings large enough to train nlist clusters"""
+        sample_size = max(TRAIN_SAMPLE_SIZE, 40 * nlist)
+        if len(embeddings) <= sample_size:
+            return embeddings
+        rows = np.sort(np.random.default_rng(0).choice(len(embeddings), sample_size, replace=False))
+        return np.ascontiguousarray(embeddings[rows])
+    
+    def _apply_search_params(self):
+        """Apply query-time parameters (nprobe) to IVF indexes"""
+        ivf_index = faiss.try_extract_index_ivf(self.index)
+        if ivf_index is not None:
+            ivf_index.nprobe = min(self.nprobe, ivf_index.nlist)
+    
+    def _search_index(self) -> faiss.Index:
+        """Index to run searches against: a (cached) GPU copy when enabled, else the CPU index"""
+        if not self.use_gpu:
+            return self.index
+        
+        if self._gpu_index is None:
+            num_gpus = faiss.get_num_gpus()
+            try:
+                if num_gpus > 1:
+                    self._gpu_index = faiss.index_cpu_to_all_gpus(self.index)
+                else:
+                    if self._gpu_resources is None:
+                        self._gpu_resources = faiss.StandardGpuResources()
+                    self._gpu_index = faiss.index_cpu_to_gpu(self._gpu_resources, 0, self.index)
+            except Exception as e:
+                # Not every index type has a GPU implementation (e.g. ivfpq's FastScan)
+                print(f"Error copying FAISS index to GPU, searching on CPU instead: {e}")
+                self.use_gpu = False
+                return self.index
+            print(f"Copied FAISS index with {self.index.ntotal} vectors to {num_gpus} GPU(s)")
+        return self._gpu_index
+    
+    def _invalidate_search_caches(self):
+        """Drop state derived from the index and row ids after they change"""
+        self._gpu_index = None
+        with self._selector_lock:
+            self._selector_cache = OrderedDict()
+    
+    def _filter_selector(self, repo_filter: Optional[List[str]],
+                         file_type_filter: Optional[List[str]]) -> Optional[faiss.IDSelector]:
+        """Selector over the ids of chunks in the given repos/file types, or None if there are none"""
+        key = (frozenset(repo_filter or ()), frozenset(file_type_filter or ()))
+        with self._selector_lock:
+            if key in self._selector_cache:
+                self._selector_cache.move_to_end(key)
+                return self._selector_cache[key]
+        
+        # Built outside the lock; two threads missing on the same key just build it twice
+        repos, file_types = key
+        selected = np.zeros(len(self.chunks), dtype=bool)
+        for (repo_name, source_file), rows in self._file_index.items():
+            if repos and repo_name not in repos:
+                continue
+            if file_types and get_file_type(source_file) not in file_types:
+                continue
+            selected[rows] = True
+        
+        selector = None
+        if selected.any():
+            bitmap = np.packbits(selected, bitorder="little")
+            selector = faiss.IDSelectorBitmap(len(selected), faiss.swig_ptr(bitmap))
+            # The selector keeps its bitmap alive, so a search using it is safe even after eviction
+            selector.referenced_objects = [bitmap]
+        
+        with self._selector_lock:
+            self._selector_cache[key] = selector
+            if len(self._selector_cache) > SELECTOR_CACHE_SIZE:
+                self._selector_cache.popitem(last=False)
+        return selector
+    
+    def load_gpu_index(self):
+        """Copy the index to the GPU(s) now rather than on the first search"""
+        if self.use_gpu and self.index is not None:
+            self._apply_search_params()
+            self._search_index()
+    
+    def search(self, query_embedding: np.ndarray, k: int = 5, min_score: Optional[float] = None,
+               repo_filter: Optional[List[str]] = None,
+               file_type_filter: Optional[List[str]] = None) -> List[Tuple[DocumentChunk, float]]:
+        """Search for similar document chunks, optionally dropping results scored below min_score"""
+        return self.search_batch(query_embedding.reshape(1, -1), k=k, min_score=min_score,
+                                 repo_filter=repo_filter, file_type_filter=file_type_filter)[0]
+    
+    def search_batch(self, query_embeddings: np.ndarray, k: int = 5, min_score: Optional[float] = None,
+                     repo_filter: Optional[List[str]] = None, file_type_filter: Optional[List[str]] = None,
+                     normalized: bool = False) -> List[List[Tuple[DocumentChunk, float]]]:
+        """Search for similar document chunks for many queries in a single FAISS call.
+        
+        Repo and file type filters are applied inside FAISS, so up to k matching chunks are returned.
+        Scores are cosine similarities; pass normalized=True if the queries are already unit length.
+        """
+        if query_embeddings.ndim != 2:
+            raise ValueError(f"Expected a 2D array of query embeddings, got shape {query_embeddings.shape}")
+        
+        if self.index is None or self.index.ntotal == 0:
+            return [[] for _ in range(len(query_embeddings))]
+        
+        if normalized:
+            queries = np.ascontiguousarray(query_embeddings, dtype=np.float32)
+        else:
+            # Normalize a contiguous copy of the queries (normalization works in place)
+            queries = np.array(query_embeddings, dtype=np.float32)
+            normalize_rows(queries)
+        
+        # Search; quantized indexes fetch extra candidates to rescore exactly below
+        self._apply_search_params()
+        rescore = self.rescore_factor > 1 and isinstance(self.index, QUANTIZED_INDEX_TYPES)
+        final_k = k
+        k = min(k * self.rescore_factor if rescore else k, self.index.ntotal)
+        if repo_filter or file_type_filter:
+            selector = self._filter_selector(repo_filter, file_type_filter)
+            if selector is None:
+                return [[] for _ in range(len(queries))]
+            
+            # Selectors are not supported by GPU indexes, so filtered searches use the CPU index
+            ivf_index = faiss.try_extract_index_ivf(self.index)
+            if ivf_index is not None:
+                params = faiss.SearchParametersIVF(sel=selector, nprobe=ivf_index.nprobe)
+            else:
+                params = faiss.SearchParameters(sel=selector)
+            scores, indices = self.index.search(queries, k, params=params)
+        else:
+            scores, indices = self._search_index().search(queries, k)
+        
+        if rescore:
+            scores, indices = self._rescore(queries, scores, indices, final_k)
+        
+        # Drop padding (-1) ids and low scores with one vectorized mask
+        valid = (indices >= 0) & (indices < len(self.chunks))
+        if min_score is not None:
+            valid &= scores >= min_score
+        
+        # Fetch every hit of the batch from the chunk columns at once
+        hit_ids = np.unique(indices[valid]).tolist()
+        hits = dict(zip(hit_ids, self.chunks.get_many(hit_ids)))
         
         results = []
-        for score, idx in zip(scores[0], indices[0]):
-            if idx >= 0 and idx < len(self.chunks):  # Valid index
-                results.append((self.chunks[idx], float(score)))
+        for query_scores, query_indices, query_valid in zip(scores, indices, valid):
+            query_results = []
+            for idx, score in zip(query_indices[query_valid].tolist(), query_scores[query_valid].tolist()):
+                chunk = hits[idx]
+                if chunk is not None:
+                    query_results.append((chunk, score))
+            results.append(query_results)
         
         return results
     
+    def _rescore(self, queries: np.ndarray, scores: np.ndarray, indices: np.ndarray,
+                 k: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Re-rank approximate candidates by exact inner product with the stored float32 vectors"""
+        found = indices >= 0
+        candidates = self._embeddings[np.where(found, indices, 0)]
+        exact = np.einsum("qkd,qd->qk", candidates, queries)
+        exact[~found] = -np.inf
+        
+        order = np.argsort(-exact, axis=1, kind="stable")[:, :k]
+        scores = np.take_along_axis(exact, order, axis=1).astype(np.float32)
+        indices = np.take_along_axis(indices, order, axis=1)
+        return scores, indices
+    
     def get_file_status(self, file_path: str, repo_name: str, current_hash: str) -> str:
         """Check if file needs to be processed (new, updated, or unchanged)"""
         file_key = f"{repo_name}/{file_path}"
@@ -214,10 +808,25 @@ class VectorStore:
         
         return "unchanged"
     
+    def get_repo_files(self, repo_name: str) -> Optional[List[Tuple[str, Dict]]]:
+        """(path, file metadata) for each indexed file of a repo, or None if the repo is unknown"""
+        repo = self.metadata.get("repos", {}).get(repo_name)
+        if repo is None:
+            return None
+        
+        # The repo's file list is its reverse index into metadata["files"]
+        files = self.metadata.get("files", {})
+        repo_files = []
+        for file_path in repo.get("files", []):
+            file_info = files.get(f"{repo_name}/{file_path}")
+            if file_info is not None:
+                repo_files.append((file_path, file_info))
+        return repo_files
+    
     def get_stats(self) -> Dict:
         """Get statistics about the vector store"""
         stats = {
-            "total_chunks": len(self.chunks),
+            "total_chunks": self.live_chunk_count,
             "total_files": len(self.metadata.get("files", {})),
             "total_repos": len(self.metadata.get("repos", {})),
             "index_size": self.index.ntotal if self.index else 0,
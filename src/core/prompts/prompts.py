@@ -9,17 +9,19 @@ class Prompts:
         self._base_path = Path(prompts)
         if not self._base_path.exists():
             raise FileNotFoundError(f"Prompt folder '{self._base_path}' does not exist.")
+        self._cache: dict[str, str] = {
+            path.stem: path.read_text(encoding='utf-8').strip()
+            for path in self._base_path.glob("*.txt")
+        }
     
     def get_prompt(self, prompt_name: str) -> str:
         """
         Returns the prompt text for the given prompt name.
         """
-        prompt_path = self._base_path / f"{prompt_name}.txt"
-        if not prompt_path.exists():
-            raise FileNotFoundError(f"Prompt file '{prompt_name}.txt' does not exist.")
-        
-        with open(prompt_path, 'r', encoding='utf-8') as file:
-            return file.read().strip()
+        try:
+            return self._cache[prompt_name]
+        except KeyError:
+            raise FileNotFoundError(f"Prompt file '{prompt_name}.txt' does not exist.") from None
             
     def get_context_prompt(self) -> str:
         """
@@ -1,7 +1,8 @@
 from .news_service import NewsSearchService, NewsArticle
 from .content_service import (
     AIContentService,
-    BaseAIProvider
+    BaseAIProvider,
+    BedrockAPIError
 )
 
 from .contracts import (
@@ -14,5 +15,6 @@ __all__ = [
     "AIContentService",
     "AIProviderConfig",
     "AIProviderResponse",
-    "BaseAIProvider"
+    "BaseAIProvider",
+    "BedrockAPIError"
 ]
\ No newline at end of file
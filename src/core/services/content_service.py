@@ -1,12 +1,18 @@
 from abc import ABC, abstractmethod
 import asyncio
-import json
-from typing import List, Optional, Dict, Any, Union
+import functools
+import os
+import string
+import sys
+from concurrent.futures import Executor, ThreadPoolExecutor
+from typing import AsyncIterator, Callable, Iterable, List, Optional, Dict, Any, Tuple, Union
 from fastapi import HTTPException
 from pydantic import BaseModel, Field
 from datetime import datetime
 from enum import Enum
 
+import orjson
+
 # Import existing service contracts
 from .lean import (
     ContentGenerationService, 
@@ -24,6 +30,26 @@ from .contracts import (
     PromptTemplate,
 )
 
+# Level names by lean_level (1-5)
+LEVEL_NAMES = ("basic", "intermediate", "advanced", "expert", "master")
+
+_CONVERSIONS = {None: lambda value: value, "s": str, "r": repr, "a": ascii}
+
+
+@functools.lru_cache(maxsize=32)
+def _parse_template(template: str) -> Tuple[Tuple[str, Optional[str], str, Optional[str]], ...]:
+    """Split a format string into (literal, field, format_spec, conversion) parts once"""
+    return tuple(string.Formatter().parse(template))
+
+
+def render_template(template: str, data: Dict[str, Any]) -> str:
+    """Equivalent of template.format_map(data) for plain {field} templates, reusing the parsed template"""
+    return "".join([
+        literal if field is None else literal + format(_CONVERSIONS[conversion](data[field]), spec)
+        for literal, field, spec, conversion in _parse_template(template)
+    ])
+
+
 class BaseAIProvider(ABC):
     """Base class for AI providers"""
     
@@ -36,13 +62,38 @@ class BaseAIProvider(ABC):
         """Call the provider's API"""
         pass
     
+    async def _stream_api(self, prompt_data: Dict[str, Any]) -> AsyncIterator[str]:
+        """Stream generated text as it arrives (defaults to the full _call_api response)"""
+        response = await self._call_api(prompt_data)
+        yield response.content
+    
+    def _render_prompts(self, prompt_data: Dict[str, Any]) -> Tuple[str, str]:
+        """Fill the system and user prompt templates"""
+        return (render_template(self.prompt_templates.system_prompt, prompt_data),
+                render_template(self.prompt_templates.user_prompt, prompt_data))
+    
     @abstractmethod
     def _get_model_info(self) -> str:
         """Get model information string"""
         pass
     
-    def _load_prompt_templates(self) -> PromptTemplate:
-        """Load default prompt templates"""
+    @staticmethod
+    async def _iterate_in_executor(make_iterator: Callable[[], Iterable[str]],
+                                   executor: Optional[Executor] = None) -> AsyncIterator[str]:
+        """Drive a blocking SDK stream from an executor, yielding each item to the event loop"""
+        loop = asyncio.get_event_loop()
+        iterator = await loop.run_in_executor(executor, lambda: iter(make_iterator()))
+        done = object()
+        while True:
+            item = await loop.run_in_executor(executor, next, iterator, done)
+            if item is done:
+                return
+            yield item
+    
+    @staticmethod
+    @functools.cache
+    def _load_prompt_templates() -> PromptTemplate:
+        """Load default prompt templates (built once and shared by all providers)"""
         return PromptTemplate(
             system_prompt="""You are DR★NATE, an expert content generator that creates adaptive content based on lean levels. 
 
@@ -122,8 +173,7 @@ Create a <code-example> web component with:
         primary_axis = request.lean_axes[0]
         
         # Map level number to level name
-        level_names = ["basic", "intermediate", "advanced", "expert", "master"]
-        level_key = level_names[request.lean_level - 1]
+        level_key = LEVEL_NAMES[request.lean_level - 1]
         
         # Get level info (with fallback)
         if level_key in primary_axis.levels:
@@ -155,7 +205,7 @@ Create a <code-example> web component with:
             "lean_level_description": level_info.description,
             "component_specific_instructions": component_instructions,
             "lean_specific_instructions": lean_specific_instructions,
-            "context": json.dumps(request.context) if request.context else "{}"
+            "context": orjson.dumps(request.context).decode() if request.context else "{}"
         }
     
     def _parse_response(self, ai_response: AIProviderResponse, request: GenerationRequest) -> GeneratedComponent:
@@ -180,9 +230,10 @@ Create a <code-example> web component with:
     
     def _estimate_read_time(self, content: str) -> int:
         """Estimate reading time in minutes"""
-        word_count = len(content.split())
+        # Spaces approximate word boundaries closely enough without building a token list
+        word_count = content.count(" ") + 1
         words_per_minute = 200  # Average reading speed
-        return max(1, round(word_count / words_per_minute))
+        return max(1, (word_count + words_per_minute // 2) // words_per_minute)
 
 class AIContentService(ContentGenerationService):
     """Content service using pluggable AI providers"""
@@ -190,8 +241,18 @@ class AIContentService(ContentGenerationService):
     def __init__(self, provider: BaseAIProvider):
         self.provider = provider
     
+    @staticmethod
+    def _validate_request(request: GenerationRequest):
+        """Reject requests no provider can generate for, before any provider call"""
+        if not request.topic.strip():
+            raise ValueError("Generation request topic must not be blank")
+    
     async def generate_content(self, request: GenerationRequest) -> GenerationResponse:
-        """Generate content using the configured AI provider"""
+        """Generate content using the configured AI provider.
+        
+        Raises ValueError for an invalid request; provider failures are returned as an unsuccessful response.
+        """
+        self._validate_request(request)
         start_time = datetime.now()
         
         try:
@@ -229,6 +290,13 @@ class AIContentService(ContentGenerationService):
                 generation_time_ms=int(generation_time)
             )
     
+    async def stream_content(self, request: GenerationRequest) -> AsyncIterator[str]:
+        """Stream generated HTML as the provider produces it"""
+        self._validate_request(request)
+        prompt_data = self.provider._prepare_prompt(request)
+        async for text in self.provider._stream_api(prompt_data):
+            yield text
+    
     async def get_available_axes(self) -> List[LeanAxis]:
         """Get all available lean axes"""
         return [
@@ -296,13 +364,58 @@ class AIContentService(ContentGenerationService):
 
 try:
     import boto3
+    from botocore.config import Config as BotoConfig
     from botocore.exceptions import ClientError
     AWS_BEDROCK_AVAILABLE = True
 except ImportError:
     AWS_BEDROCK_AVAILABLE = False
     print("AWS Bedrock SDK not available. Please install 'boto3' package.")
 
+try:
+    import aioboto3
+    AIOBOTO3_AVAILABLE = True
+except ImportError:
+    AIOBOTO3_AVAILABLE = False
+
+# Known stop reasons, interned so long-lived response metadata shares one copy of each
+_STOP_REASONS = {reason: sys.intern(reason) for reason in ("end_turn", "max_tokens", "stop_sequence", "tool_use")}
+
+class BedrockAPIError(Exception):
+    """A Bedrock call was rejected or failed (the botocore ClientError is chained as __cause__)"""
+
 if AWS_BEDROCK_AVAILABLE:
+    def _session_kwargs(region_name: str, aws_access_key_id: Optional[str] = None,
+                        aws_secret_access_key: Optional[str] = None,
+                        aws_session_token: Optional[str] = None) -> Dict[str, Any]:
+        """Session arguments for a region and optional explicit credentials"""
+        session_kwargs = {
+            "region_name": region_name
+        }
+        
+        if aws_access_key_id:
+            session_kwargs.update({
+                "aws_access_key_id": aws_access_key_id,
+                "aws_secret_access_key": aws_secret_access_key,
+                "aws_session_token": aws_session_token
+            })
+        return session_kwargs
+
+    def _client_config(max_pool_connections: int) -> "BotoConfig":
+        """Connection pool and retry settings for bedrock-runtime clients"""
+        return BotoConfig(
+            max_pool_connections=max_pool_connections,
+            retries={"mode": "adaptive", "max_attempts": 3}
+        )
+
+    @functools.lru_cache(maxsize=16)
+    def _get_bedrock_client(region_name: str, aws_access_key_id: Optional[str] = None,
+                            aws_secret_access_key: Optional[str] = None, aws_session_token: Optional[str] = None,
+                            max_pool_connections: int = 50):
+        """Create (once per region and credentials) a thread-safe bedrock-runtime client"""
+        session = boto3.Session(**_session_kwargs(region_name, aws_access_key_id,
+                                                  aws_secret_access_key, aws_session_token))
+        return session.client("bedrock-runtime", config=_client_config(max_pool_connections))
+
     class BedrockModel(str, Enum):
         """Available Bedrock models"""
         CLAUDE_3_HAIKU = "anthropic.claude-3-haiku-20240307-v1:0"
@@ -318,6 +431,18 @@ if AWS_BEDROCK_AVAILABLE:
         model_id: BedrockModel = Field(default=BedrockModel.CLAUDE_3_5_SONNET, description="Model to use")
         top_k: int = Field(default=250, ge=0, description="Top-k sampling")
         stop_sequences: List[str] = Field(default_factory=list, description="Stop sequences")
+        max_parallel_requests: int = Field(
+            default_factory=lambda: (os.cpu_count() or 1) * 5, ge=1,
+            description="Concurrent Bedrock calls (executor threads and HTTP connections)"
+        )
+        use_response_stream: bool = Field(
+            default=False, description="Generate through invoke_model_with_response_stream, parsing while the model runs"
+        )
+        use_async_client: bool = Field(
+            default=False,
+            description="Call invoke_model through aioboto3 when installed, instead of boto3 in the executor; "
+                        "call the provider's aclose() on shutdown"
+        )
         
         # AWS credentials (optional - can use IAM roles)
         aws_access_key_id: Optional[str] = Field(None, description="AWS access key")
@@ -330,39 +455,67 @@ if AWS_BEDROCK_AVAILABLE:
         def __init__(self, config: BedrockConfig):
             super().__init__(config)
             self.bedrock_config = config
+            self._model_id = config.model_id.value
+            self._model_info = f"AWS Bedrock - {self._model_id}"
+            # Request settings shared by every call; only the prompts change
+            self._body_template = {
+                "anthropic_version": "bedrock-2023-05-31",
+                "max_tokens": config.max_tokens,
+                "temperature": config.temperature,
+                "top_p": config.top_p,
+                "top_k": config.top_k,
+                "stop_sequences": list(config.stop_sequences)
+            }
             self.client = self._create_client()
+            self._async_client = None
+            self._async_client_lock = asyncio.Lock()
+            # boto3 calls block on I/O, so each provider gets an executor sized by its own
+            # max_parallel_requests rather than sharing the (much smaller) default one
+            self._executor = ThreadPoolExecutor(
+                max_workers=config.max_parallel_requests, thread_name_prefix="bedrock"
+            )
         
         def _create_client(self):
-            """Create Bedrock client"""
-            session_kwargs = {
-                "region_name": self.bedrock_config.region_name
-            }
-            
-            if self.bedrock_config.aws_access_key_id:
-                session_kwargs.update({
-                    "aws_access_key_id": self.bedrock_config.aws_access_key_id,
-                    "aws_secret_access_key": self.bedrock_config.aws_secret_access_key,
-                    "aws_session_token": self.bedrock_config.aws_session_token
-                })
-            
-            session = boto3.Session(**session_kwargs)
-            return session.client("bedrock-runtime")
+            """Get the shared Bedrock client for this region and credentials"""
+            return _get_bedrock_client(
+                self.bedrock_config.region_name,
+                self.bedrock_config.aws_access_key_id,
+                self.bedrock_config.aws_secret_access_key,
+                self.bedrock_config.aws_session_token,
+                self.bedrock_config.max_parallel_requests
+            )
+        
+        async def _get_async_client(self):
+            """Open the aioboto3 bedrock-runtime client on first use"""
+            async with self._async_client_lock:
+                if self._async_client is None:
+                    session = aioboto3.Session(**_session_kwargs(
+                        self.bedrock_config.region_name,
+                        self.bedrock_config.aws_access_key_id,
+                        self.bedrock_config.aws_secret_access_key,
+                        self.bedrock_config.aws_session_token
+                    ))
+                    self._async_client = await session.client(
+                        "bedrock-runtime", config=_client_config(self.bedrock_config.max_parallel_requests)
+                    ).__aenter__()
+            return self._async_client
+        
+        async def aclose(self):
+            """Close the aioboto3 client, if one was opened, and stop the executor threads"""
+            if self._async_client is not None:
+                await self._async_client.__aexit__(None, None, None)
+                self._async_client = None
+            self._executor.shutdown(wait=False)
         
         def _get_model_info(self) -> str:
-            return f"AWS Bedrock - {self.bedrock_config.model_id.value}"
+            return self._model_info
         
-        async def _call_api(self, prompt_data: Dict[str, Any]) -> AIProviderResponse:
-            """Call Bedrock API"""
-            system_prompt = self.prompt_templates.system_prompt.format(**prompt_data)
-            user_prompt = self.prompt_templates.user_prompt.format(**prompt_data)
+        def _build_request_body(self, prompt_data: Dict[str, Any]) -> Dict[str, Any]:
+            """Build the Anthropic messages request body"""
+            system_prompt, user_prompt = self._render_prompts(prompt_data)
             
-            request_body = {
-                "anthropic_version": "bedrock-2023-05-31",
-                "max_tokens": self.config.max_tokens,
-                "temperature": self.config.temperature,
-                "top_p": self.config.top_p,
-                "top_k": self.bedrock_config.top_k,
-                "stop_sequences": self.bedrock_config.stop_sequences,
+            return {
+                **self._body_template,
                 "system": system_prompt,
                 "messages": [
                     {
@@ -371,42 +524,138 @@ if AWS_BEDROCK_AVAILABLE:
                     }
                 ]
             }
+        
+        async def _call_api(self, prompt_data: Dict[str, Any]) -> AIProviderResponse:
+            """Call Bedrock API"""
+            if self.bedrock_config.use_response_stream:
+                return await self._call_api_streaming(prompt_data)
+            
+            if self.bedrock_config.use_async_client and AIOBOTO3_AVAILABLE:
+                return await self._call_api_async(prompt_data)
             
             loop = asyncio.get_event_loop()
             
             def _call_sync():
+                # Prompt rendering and serialization run here too, keeping them off the event loop
+                body = orjson.dumps(self._build_request_body(prompt_data))
                 try:
                     response = self.client.invoke_model(
-                        body=json.dumps(request_body),
-                        modelId=self.bedrock_config.model_id.value,
+                        body=body,
+                        modelId=self._model_id,
                         accept="application/json",
                         contentType="application/json"
                     )
                     
-                    response_body = json.loads(response.get("body").read())
-                    
-                    content = ""
-                    if response_body.get("content") and len(response_body["content"]) > 0:
-                        content = response_body["content"][0].get("text", "")
-                    
-                    usage_stats = response_body.get("usage", {})
-                    
-                    return AIProviderResponse(
-                        content=content,
-                        model_info=self._get_model_info(),
-                        usage_stats=usage_stats,
-                        metadata={
-                            "stop_reason": response_body.get("stop_reason"),
-                            "response_id": response_body.get("id")
-                        }
-                    )
+                    return self._parse_invoke_response(orjson.loads(response["body"].read()))
                     
                 except ClientError as e:
-                    raise Exception(f"Bedrock API error: {e}")
-                except Exception as e:
-                    raise Exception(f"Bedrock error: {e}")
+                    raise BedrockAPIError(f"Bedrock API error: {e}") from e
             
-            return await loop.run_in_executor(None, _call_sync)
+            return await loop.run_in_executor(self._executor, _call_sync)
+        
+        async def _call_api_async(self, prompt_data: Dict[str, Any]) -> AIProviderResponse:
+            """Call Bedrock API with the aioboto3 client, without an executor thread"""
+            body = orjson.dumps(self._build_request_body(prompt_data))
+            try:
+                client = await self._get_async_client()
+                response = await client.invoke_model(
+                    body=body,
+                    modelId=self._model_id,
+                    accept="application/json",
+                    contentType="application/json"
+                )
+                
+                return self._parse_invoke_response(orjson.loads(await response["body"].read()))
+                
+            except ClientError as e:
+                raise BedrockAPIError(f"Bedrock API error: {e}") from e
+        
+        def _parse_invoke_response(self, response_body: Dict[str, Any]) -> AIProviderResponse:
+            """Convert an invoke_model response body into an AIProviderResponse"""
+            content_blocks = response_body.get("content") or ()
+            content = content_blocks[0].get("text", "") if content_blocks else ""
+            usage_stats = response_body.get("usage") or {}
+            stop_reason = response_body.get("stop_reason")
+            
+            return AIProviderResponse.model_construct(
+                content=content,
+                model_info=self._get_model_info(),
+                usage_stats=usage_stats,
+                metadata={
+                    "stop_reason": _STOP_REASONS.get(stop_reason, stop_reason),
+                    "response_id": response_body.get("id")
+                }
+            )
+        
+        def _stream_events(self, prompt_data: Dict[str, Any]) -> Iterable[Dict[str, Any]]:
+            """Invoke the model with a response stream and yield each parsed event (blocking)"""
+            body = orjson.dumps(self._build_request_body(prompt_data))
+            try:
+                response = self.client.invoke_model_with_response_stream(
+                    body=body,
+                    modelId=self._model_id,
+                    accept="application/json",
+                    contentType="application/json"
+                )
+                
+                for event in response.get("body"):
+                    chunk = event.get("chunk")
+                    if chunk:
+                        yield orjson.loads(chunk["bytes"])
+                
+            except ClientError as e:
+                raise BedrockAPIError(f"Bedrock API error: {e}") from e
+        
+        async def _stream_api(self, prompt_data: Dict[str, Any]) -> AsyncIterator[str]:
+            """Stream Bedrock text deltas with invoke_model_with_response_stream"""
+            def _stream_sync():
+                for payload in self._stream_events(prompt_data):
+                    if payload.get("type") == "content_block_delta":
+                        text = payload.get("delta", {}).get("text")
+                        if text:
+                            yield text
+            
+            async for text in self._iterate_in_executor(_stream_sync, self._executor):
+                yield text
+        
+        async def _call_api_streaming(self, prompt_data: Dict[str, Any]) -> AIProviderResponse:
+            """Call Bedrock through the response stream, parsing events as they arrive"""
+            loop = asyncio.get_event_loop()
+            
+            def _call_sync():
+                parts = []
+                usage_stats = {}
+                metadata = {"stop_reason": None, "response_id": None}
+                for payload in self._stream_events(prompt_data):
+                    event_type = payload.get("type")
+                    if event_type == "content_block_delta":
+                        parts.append(payload.get("delta", {}).get("text", ""))
+                    elif event_type == "message_start":
+                        message = payload.get("message", {})
+                        metadata["response_id"] = message.get("id")
+                        usage_stats.update(message.get("usage", {}))
+                    elif event_type == "message_delta":
+                        stop_reason = payload.get("delta", {}).get("stop_reason")
+                        metadata["stop_reason"] = _STOP_REASONS.get(stop_reason, stop_reason)
+                        usage_stats.update(payload.get("usage", {}))
+                
+                return AIProviderResponse.model_construct(
+                    content="".join(parts),
+                    model_info=self._get_model_info(),
+                    usage_stats=usage_stats,
+                    metadata=metadata
+                )
+            
+            return await loop.run_in_executor(self._executor, _call_sync)
+
+    # Optionally create the default provider's client at import, loading botocore's endpoint and
+    # service model data up front instead of in the first BedrockProvider()
+    if os.environ.get("BEDROCK_EAGER_WARMUP") == "1":
+        _default_config = BedrockConfig()
+        _get_bedrock_client(_default_config.region_name, _default_config.aws_access_key_id,
+                            _default_config.aws_secret_access_key, _default_config.aws_session_token,
+                            _default_config.max_parallel_requests)
+        del _default_config
 
 # ===== GCP GEMINI PROVIDER =====
 
@@ -472,17 +721,17 @@ if GCP_AVAILABLE:
         def _get_model_info(self) -> str:
             return f"Google Gemini - {self.gemini_config.model_name.value}"
         
+        def _build_prompt(self, prompt_data: Dict[str, Any]) -> str:
+            """Combine system and user prompts for Gemini"""
+            system_prompt, user_prompt = self._render_prompts(prompt_data)
+            return f"{system_prompt}\n\n{user_prompt}"
+        
         async def _call_api(self, prompt_data: Dict[str, Any]) -> AIProviderResponse:
             """Call Gemini API"""
-            system_prompt = self.prompt_templates.system_prompt.format(**prompt_data)
-            user_prompt = self.prompt_templates.user_prompt.format(**prompt_data)
-            
-            # Combine system and user prompts for Gemini
-            full_prompt = f"{system_prompt}\n\n{user_prompt}"
-            
             loop = asyncio.get_event_loop()
             
             def _call_sync():
+                full_prompt = self._build_prompt(prompt_data)
                 try:
                     response = self.model.generate_content(full_prompt)
                     
@@ -502,7 +751,7 @@ if GCP_AVAILABLE:
                         "total_tokens": response.usage_metadata.total_token_count if response.usage_metadata else 0
                     }
                     
-                    return AIProviderResponse(
+                    return AIProviderResponse.model_construct(
                         content=content,
                         model_info=self._get_model_info(),
                         usage_stats=usage_stats,
@@ -519,6 +768,20 @@ if GCP_AVAILABLE:
                     raise Exception(f"Gemini API error: {e}")
             
             return await loop.run_in_executor(None, _call_sync)
+        
+        async def _stream_api(self, prompt_data: Dict[str, Any]) -> AsyncIterator[str]:
+            """Stream Gemini text as it is generated"""
+            def _stream_sync():
+                full_prompt = self._build_prompt(prompt_data)
+                try:
+                    for response in self.model.generate_content(full_prompt, stream=True):
+                        if response.candidates and response.candidates[0].content.parts:
+                            yield response.text
+                except Exception as e:
+                    raise Exception(f"Gemini API error: {e}")
+            
+            async for text in self._iterate_in_executor(_stream_sync):
+                yield text
 
 # ===== USAGE EXAMPLES =====
 
@@ -627,6 +890,7 @@ async def example_provider_switching():
 async def create_multi_provider_fastapi():
     """FastAPI app with multiple provider support"""
     from fastapi import FastAPI, Request, Query
+    from fastapi.responses import StreamingResponse
     from fastapi.templating import Jinja2Templates
     
     app = FastAPI()
@@ -638,6 +902,13 @@ async def create_multi_provider_fastapi():
         "gemini": GeminiProvider(GeminiConfig(api_key="your-key"))
     }
     
+    @app.on_event("shutdown")
+    async def close_providers():
+        """Release provider clients and threads"""
+        for provider in providers.values():
+            if hasattr(provider, "aclose"):
+                await provider.aclose()
+    
     @app.get("/generate/{article_id}")
     async def generate_content(
         request: Request,
@@ -669,6 +940,29 @@ async def create_multi_provider_fastapi():
             "generation_meta": response.article_metadata
         })
     
+    @app.get("/generate/{article_id}/stream")
+    async def stream_content(
+        article_id: str,
+        level: int = 3,
+        provider: str = Query(default="bedrock", description="AI provider to use")
+    ):
+        if provider not in providers:
+            raise HTTPException(status_code=400, detail=f"Unknown provider: {provider}")
+        
+        service = AIContentService(providers[provider])
+        axes = await service.get_available_axes()
+        
+        gen_request = GenerationRequest(
+            article_id=article_id,
+            component_type=ComponentType.ARTICLE_CONTENT,
+            lean_level=level,
+            lean_axes=[axes[0]],
+            topic=article_id.replace("-", " ").title()
+        )
+        
+        # HTML is sent as it is generated, so the first bytes arrive with the first tokens
+        return StreamingResponse(service.stream_content(gen_request), media_type="text/html")
+    
     return app
 
 if __name__ == "__main__":
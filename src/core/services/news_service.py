@@ -58,6 +58,9 @@ class NewsSearchService:
         self.api_key = api_key or os.getenv('THENEWSAPI_KEY')
         self.base_url = "https://newsapi.org/v2/"
         
+        # One client for the service's lifetime so connections are kept alive between searches
+        self._client = httpx.AsyncClient(base_url=self.base_url, timeout=10)
+        
         # Regional mappings for news sources
         self.regions = {
             'american': {
@@ -86,6 +89,16 @@ class NewsSearchService:
             'science': 'science'
         }
 
+    async def aclose(self):
+        """Close the underlying HTTP client"""
+        await self._client.aclose()
+
+    async def __aenter__(self) -> "NewsSearchService":
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.aclose()
+
     async def search_headlines(self, 
                         region: str = 'american',
                         category: str = 'general',
@@ -131,10 +144,9 @@ class NewsSearchService:
             
             # Make API request
             logger.info(f"Searching {region} {category} news with params: {params}")
-            async with httpx.AsyncClient(timeout=10) as client:
-                response = await client.get(self.base_url + Endpoints.TOP_HEADLINES, params=params)
-                response.raise_for_status()
-                data = response.json()
+            response = await self._client.get(Endpoints.TOP_HEADLINES, params=params)
+            response.raise_for_status()
+            data = response.json()
             
             # Use NewsSearchResponse for parsing
             news_response = NewsSearchResponse(**data)
@@ -185,10 +197,9 @@ class NewsSearchService:
             params['published_after'] = published_after.strftime('%Y-%m-%dT%H:%M:%S')
             
             logger.info(f"Searching for keywords '{keywords}' in {region}")
-            async with httpx.AsyncClient(timeout=10) as client:
-                response = await client.get(self.base_url + Endpoints.EVERYTHING, params=params)
-                response.raise_for_status()
-                data = response.json()
+            response = await self._client.get(Endpoints.EVERYTHING, params=params)
+            response.raise_for_status()
+            data = response.json()
             
             articles = []
             for item in data.get('data', []):
@@ -254,6 +265,8 @@ if __name__ == "__main__":
             print(f"• {article.title}")
             print(f"  {article.description[:100] if article.description else "N/A"}...")
             print()
+        
+        await service.aclose()
     
     # Run the main function
     asyncio.run(main())
\ No newline at end of file
@@ -4,6 +4,7 @@ import os
 from pathlib import Path
 from typing import Dict, Any
 from dataclasses import dataclass
+from functools import cached_property
 
 @dataclass
 class AIProviderConfig:
@@ -14,6 +15,9 @@ class AIProviderConfig:
 
 class ConfigurationSettings:
     """Simple configuration management reading from config/application.yml"""
+
+    _CACHED_PROPERTIES = ('ai_providers', 'pipeline_settings', 'server_settings', 'search_settings',
+                          'vector_db_settings')
     
     def __init__(self, config_path: str = "config/application.yml"):
         self.config_path = Path(config_path)
@@ -27,8 +31,12 @@ class ConfigurationSettings:
         
         with open(self.config_path, 'r') as f:
             self._config = yaml.safe_load(f)
+
+        # Drop values derived from the previous config so a reload is picked up
+        for name in self._CACHED_PROPERTIES:
+            self.__dict__.pop(name, None)
     
-    @property
+    @cached_property
     def ai_providers(self) -> Dict[str, AIProviderConfig]:
         """Get AI provider configurations"""
         providers = {}
@@ -56,7 +64,7 @@ class ConfigurationSettings:
             raise ValueError("THENEWSAPI_KEY environment variable required")
         return key
     
-    @property
+    @cached_property
     def pipeline_settings(self) -> Dict[str, Any]:
         """Get pipeline configuration"""
         return self._config.get('pipeline', {
@@ -66,7 +74,17 @@ class ConfigurationSettings:
             'overlap': 50
         })
     
-    @property
+    @cached_property
+    def vector_db_settings(self) -> Dict[str, Any]:
+        """Get the vector_db settings shared with the indexing pipeline (config/repos_indexed.yml)"""
+        repos_config_path = Path(self._config.get('pipeline', {}).get('repos_config', 'config/repos_indexed.yml'))
+        if not repos_config_path.exists():
+            return {}
+        
+        with open(repos_config_path, 'r') as f:
+            return (yaml.safe_load(f) or {}).get('settings', {}).get('vector_db', {})
+    
+    @cached_property
     def server_settings(self) -> Dict[str, Any]:
         """Get server configuration"""
         return self._config.get('server', {
@@ -74,6 +92,17 @@ class ConfigurationSettings:
             'port': 8000,
             'debug': False
         })
+    
+    @cached_property
+    def search_settings(self) -> Dict[str, Any]:
+        """Get search service configuration"""
+        return self._config.get('search', {
+            'max_batch_size': 32,
+            'max_wait_ms': 2,
+            'encode_max_batch_size': 32,
+            'encode_max_wait_ms': 10,
+            'max_concurrent_batches': 4
+        })
 
 # Global configuration instance
 settings = ConfigurationSettings()
\ No newline at end of file
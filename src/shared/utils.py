@@ -9,12 +9,9 @@ T = TypeVar('T')
 
 def get_file_hash(file_path: str) -> str:
     """Calculate SHA-256 hash of a file"""
-    hash_sha256 = hashlib.sha256()
     try:
         with open(file_path, "rb") as f:
-            for chunk in iter(lambda: f.read(4096), b""):
-                hash_sha256.update(chunk)
-        return hash_sha256.hexdigest()
+            return hashlib.file_digest(f, "sha256").hexdigest()
     except Exception:
         return ""
 
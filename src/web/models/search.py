@@ -1,14 +1,15 @@
 # Pydantic models for API
 from pydantic import BaseModel, Field
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, FrozenSet
 
 
 class SearchRequest(BaseModel):
     query: str = Field(..., description="Search query text")
     limit: int = Field(default=10, ge=1, le=100, description="Maximum number of results")
-    min_score: float = Field(default=0.0, ge=0.0, le=1.0, description="Minimum similarity score")
-    repo_filter: Optional[List[str]] = Field(default=None, description="Filter by repository names")
-    file_type_filter: Optional[List[str]] = Field(default=None, description="Filter by file types (.pdf, .docx, .md)")
+    min_score: float = Field(default=0.0, ge=0.0, le=1.0, description="Minimum cosine similarity score")
+    repo_filter: Optional[FrozenSet[str]] = Field(default=None, description="Filter by repository names")
+    file_type_filter: Optional[FrozenSet[str]] = Field(default=None, description="Filter by file types (.pdf, .docx, .md)")
+    max_chars: int = Field(default=1000, ge=50, le=20000, description="Truncate each result's content to this many characters")
 
 
 class SearchResult(BaseModel):
@@ -1,4 +1,5 @@
 from fastapi import APIRouter, Request, HTTPException
+from fastapi.responses import Response
 from fastapi.templating import Jinja2Templates
 from pathlib import Path
 import sys
@@ -54,7 +55,8 @@ async def daily_home(request: Request, lean: int = 0):
         )
         accept = request.headers.get("accept", "text/html")
         if "application/json" in accept:
-            return response
+            # Serialized straight to JSON by pydantic-core, skipping FastAPI's jsonable_encoder
+            return Response(response.model_dump_json(), media_type="application/json")
         # For HTML, build context for template
         context = response.model_dump()
         context["current_topic"] = f"Daily Brief - Lean {req.lean}"
@@ -7,19 +7,27 @@ Provides REST API endpoints for document search functionality.
 import os
 import sys
 from pathlib import Path
-from typing import List, Dict, Optional, Any
+from typing import List, Dict, Optional, Any, Tuple, Union, NamedTuple, FrozenSet, TYPE_CHECKING
 from datetime import datetime
+from time import perf_counter_ns
+import asyncio
 import logging
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 
+import numpy as np
 from fastapi import FastAPI, HTTPException, Query, BackgroundTasks
 from pydantic import BaseModel, Field
-from sentence_transformers import SentenceTransformer
 import uvicorn
 
 # Add current directory to path to import modules
 sys.path.append(str(Path(__file__).parent.parent))
 
-from core.pipeline import VectorStore
+from core.pipeline import VectorStore, MicroBatcher
+from core.pipeline.onnx_encoder import OnnxEncoder, ONNX_AVAILABLE
+
+if TYPE_CHECKING:
+    from sentence_transformers import SentenceTransformer
 
 # Initialize FastAPI app
 app = FastAPI(
@@ -33,9 +41,21 @@ app = FastAPI(
 
 # Global variables for loaded components
 vector_store: Optional[VectorStore] = None
-search_model: Optional[SentenceTransformer] = None
+search_model: Optional[Union["SentenceTransformer", OnnxEncoder]] = None
+search_batcher: Optional[MicroBatcher] = None
+encode_batcher: Optional[MicroBatcher] = None
 logger = logging.getLogger(__name__)
 
+# Recently encoded queries (whitespace-normalized text -> embedding), least recent first
+QUERY_CACHE_SIZE = 4096
+query_embedding_cache: "OrderedDict[str, np.ndarray]" = OrderedDict()
+
+# Serializes /reload requests
+reload_lock = asyncio.Lock()
+
+# Query encoding and FAISS searches run here so they don't block the event loop
+EXECUTOR = ThreadPoolExecutor(max_workers=os.cpu_count())
+
 
 def setup_logging():
     """Configure logging"""
@@ -45,17 +65,138 @@ def setup_logging():
     )
 
 
+def encode_queries(queries: List[str]) -> List[np.ndarray]:
+    """Encode queries with one SentenceTransformer.encode call"""
+    # Encode in length order so similar-length queries share padding
+    order = sorted(range(len(queries)), key=lambda i: len(queries[i]))
+    embeddings = search_model.encode([queries[i] for i in order], batch_size=len(queries),
+                                     convert_to_numpy=True, normalize_embeddings=True)
+    results = [None] * len(queries)
+    for embedding, i in zip(embeddings, order):
+        results[i] = embedding
+    return results
+
+
+async def encode_query(query: str) -> np.ndarray:
+    """Embedding for a query, from the LRU cache or the encode batcher"""
+    key = " ".join(query.split())
+    embedding = query_embedding_cache.get(key)
+    if embedding is not None:
+        query_embedding_cache.move_to_end(key)
+        return embedding
+    
+    embedding = await encode_batcher.submit(key)
+    query_embedding_cache[key] = embedding
+    if len(query_embedding_cache) > QUERY_CACHE_SIZE:
+        query_embedding_cache.popitem(last=False)
+    return embedding
+
+
+class SearchQuery(NamedTuple):
+    """A single /search query as submitted to the search batcher"""
+    embedding: np.ndarray
+    k: int
+    min_score: float
+    repo_filter: Optional[FrozenSet[str]] = None
+    file_type_filter: Optional[FrozenSet[str]] = None
+
+
+def run_search_batch(queries: List[SearchQuery]) -> List[List[Tuple[Any, float]]]:
+    """Run queries with one VectorStore.search_batch call per distinct filter"""
+    groups: Dict[Tuple, List[int]] = {}
+    for i, query in enumerate(queries):
+        groups.setdefault((query.repo_filter, query.file_type_filter), []).append(i)
+    
+    results: List[List[Tuple[Any, float]]] = [[] for _ in queries]
+    for (repo_filter, file_type_filter), members in groups.items():
+        max_k = max(queries[i].k for i in members)
+        # The lowest threshold is applied inside search_batch; only stricter queries filter again
+        group_min_score = min(queries[i].min_score for i in members)
+        batch_results = vector_store.search_batch(
+            np.stack([queries[i].embedding for i in members]), k=max_k, min_score=group_min_score,
+            repo_filter=repo_filter, file_type_filter=file_type_filter,
+            normalized=True  # encode_queries normalizes embeddings
+        )
+        for i, query_results in zip(members, batch_results):
+            query = queries[i]
+            if query.min_score > group_min_score:
+                results[i] = [(chunk, score) for chunk, score in query_results[:query.k]
+                              if score >= query.min_score]
+            else:
+                results[i] = query_results[:query.k]
+    return results
+
+
+def load_settings(name: str) -> Dict[str, Any]:
+    """One section of the shared settings, or {} (all defaults) if config/application.yml is not found.
+    
+    Imported on first use rather than with this module, since loading it reads the config relative to the cwd.
+    """
+    try:
+        from shared.config import settings
+    except FileNotFoundError as e:
+        logger.warning(f"{e}; using default {name}")
+        return {}
+    return getattr(settings, name)
+
+
+def create_vector_store() -> VectorStore:
+    """Load the (read-only, memory-mapped) vector store, keeping a GPU copy of the index resident if vector_db.use_gpu is set"""
+    vector_db_settings = load_settings('vector_db_settings')
+    # FAISS_USE_GPU=1/0 overrides the config for a single deployment
+    use_gpu_override = os.getenv("FAISS_USE_GPU")
+    use_gpu = (use_gpu_override == "1" if use_gpu_override is not None
+               else vector_db_settings.get('use_gpu', False))
+    store = VectorStore(
+        index_type=vector_db_settings.get('index_type', 'auto'),
+        nprobe=vector_db_settings.get('nprobe', 8),
+        quantize=vector_db_settings.get('quantize', False),
+        pq_m=vector_db_settings.get('pq_m', 32),
+        use_gpu=use_gpu,
+        mmap=True
+    )
+    store.load_gpu_index()
+    return store
+
+
 def load_components():
     """Load vector store and search model"""
-    global vector_store, search_model
+    global vector_store, search_model, search_batcher, encode_batcher
     
     try:
         logger.info("Loading vector store...")
-        vector_store = VectorStore()
+        vector_store = create_vector_store()
         
-        logger.info("Loading sentence transformer model...")
-        model_name = os.getenv("SENTENCE_TRANSFORMER_MODEL", "all-MiniLM-L6-v2")
-        search_model = SentenceTransformer(model_name)
+        # Concurrent requests run in parallel threads; one inference thread each avoids oversubscription
+        onnx_model_dir = os.getenv("ONNX_MODEL_DIR")
+        if onnx_model_dir and ONNX_AVAILABLE:
+            logger.info(f"Loading ONNX encoder from {onnx_model_dir}...")
+            search_model = OnnxEncoder(onnx_model_dir, num_threads=1)
+        else:
+            logger.info("Loading sentence transformer model...")
+            # Imported here so the ONNX path never loads torch
+            from sentence_transformers import SentenceTransformer
+            model_name = os.getenv("SENTENCE_TRANSFORMER_MODEL", "all-MiniLM-L6-v2")
+            search_model = SentenceTransformer(model_name)
+            import torch  # Only the SentenceTransformer path needs torch
+            torch.set_num_threads(1)
+        
+        # Concurrent /search requests share one encode call and one FAISS call
+        search_settings = load_settings('search_settings')
+        encode_batcher = MicroBatcher(
+            encode_queries,
+            max_batch_size=search_settings.get('encode_max_batch_size', 32),
+            max_wait_ms=search_settings.get('encode_max_wait_ms', 10),
+            executor=EXECUTOR,
+            max_concurrent_batches=search_settings.get('max_concurrent_batches', 4)
+        )
+        search_batcher = MicroBatcher(
+            run_search_batch,
+            max_batch_size=search_settings.get('max_batch_size', 32),
+            max_wait_ms=search_settings.get('max_wait_ms', 2),
+            executor=EXECUTOR,
+            max_concurrent_batches=search_settings.get('max_concurrent_batches', 4)
+        )
         
         stats = vector_store.get_stats()
         logger.info(f"Loaded vector store with {stats['total_chunks']} chunks")
@@ -72,6 +213,16 @@ async def startup_event():
     load_components()
 
 
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Stop the query batchers and worker threads"""
+    if encode_batcher:
+        await encode_batcher.close()
+    if search_batcher:
+        await search_batcher.close()
+    EXECUTOR.shutdown(wait=False)
+
+
 @app.get("/health", response_model=HealthResponse)
 async def health_check():
     """Health check endpoint"""
@@ -117,47 +268,37 @@ async def search_documents(request: SearchRequest):
     if not request.query.strip():
         raise HTTPException(status_code=400, detail="Query cannot be empty")
     
-    start_time = datetime.now()
+    start_time = perf_counter_ns()
     
     try:
         # Generate query embedding
-        query_embedding = search_model.encode(request.query)
+        query_embedding = await encode_query(request.query)
         
-        # Search vector store
-        raw_results = vector_store.search(query_embedding, k=request.limit * 2)  # Get extra for filtering
+        # Search vector store; repo and file type filters are applied inside FAISS
+        raw_results = await search_batcher.submit(SearchQuery(
+            embedding=query_embedding,
+            k=request.limit,
+            min_score=request.min_score,
+            repo_filter=request.repo_filter or None,
+            file_type_filter=request.file_type_filter or None
+        ))
         
-        # Filter and format results
-        filtered_results = []
-        for chunk, score in raw_results:
-            # Apply score filter
-            if score < request.min_score:
-                continue
-            
-            # Apply repo filter
-            if request.repo_filter and chunk.repo_name not in request.repo_filter:
-                continue
-            
-            # Apply file type filter
-            file_ext = Path(chunk.source_file).suffix.lower()
-            if request.file_type_filter and file_ext not in request.file_type_filter:
-                continue
-            
-            result = SearchResult(
+        # Format results, truncating long chunks to keep the payload small
+        max_chars = request.max_chars
+        filtered_results = [
+            SearchResult(
                 chunk_id=chunk.chunk_id,
-                content=chunk.content,
+                content=chunk.content if len(chunk.content) <= max_chars else chunk.content[:max_chars] + "…",
                 source_file=chunk.source_file,
                 repo_name=chunk.repo_name,
-                file_type=file_ext,
+                file_type=chunk.file_type,
                 similarity_score=score,
                 metadata=chunk.metadata
             )
-            filtered_results.append(result)
-            
-            # Stop when we have enough results
-            if len(filtered_results) >= request.limit:
-                break
+            for chunk, score in raw_results
+        ]
         
-        processing_time = (datetime.now() - start_time).total_seconds() * 1000
+        processing_time = (perf_counter_ns() - start_time) / 1e6
         
         return SearchResponse(
             query=request.query,
@@ -176,20 +317,22 @@ async def search_documents(request: SearchRequest):
 async def search_documents_get(
     q: str = Query(..., description="Search query"),
     limit: int = Query(10, ge=1, le=100, description="Maximum results"),
-    min_score: float = Query(0.0, ge=0.0, le=1.0, description="Minimum score"),
+    min_score: float = Query(0.0, ge=0.0, le=1.0, description="Minimum cosine similarity score"),
     repo: Optional[str] = Query(None, description="Repository filter (comma-separated)"),
-    file_type: Optional[str] = Query(None, description="File type filter (comma-separated)")
+    file_type: Optional[str] = Query(None, description="File type filter (comma-separated)"),
+    max_chars: int = Query(1000, ge=50, le=20000, description="Maximum content characters per result")
 ):
     """GET endpoint for search (for easy testing)"""
-    repo_filter = repo.split(',') if repo else None
-    file_type_filter = file_type.split(',') if file_type else None
+    repo_filter = frozenset(name.strip() for name in repo.split(',')) if repo else None
+    file_type_filter = frozenset(ext.strip() for ext in file_type.split(',')) if file_type else None
     
     request = SearchRequest(
         query=q,
         limit=limit,
         min_score=min_score,
         repo_filter=repo_filter,
-        file_type_filter=file_type_filter
+        file_type_filter=file_type_filter,
+        max_chars=max_chars
     )
     
     return await search_documents(request)
@@ -201,10 +344,10 @@ async def list_repositories():
     if not vector_store:
         raise HTTPException(status_code=503, detail="Vector store not loaded")
     
-    stats = vector_store.get_stats()
+    repos = vector_store.metadata.get("repos", {})
     return {
-        "repositories": list(stats.get("repos", {}).keys()),
-        "total_repos": len(stats.get("repos", {}))
+        "repositories": list(repos),
+        "total_repos": len(repos)
     }
 
 
@@ -214,45 +357,43 @@ async def get_repository_info(repo_name: str):
     if not vector_store:
         raise HTTPException(status_code=503, detail="Vector store not loaded")
     
-    stats = vector_store.get_stats()
-    repos = stats.get("repos", {})
-    
-    if repo_name not in repos:
+    files = vector_store.get_repo_files(repo_name)
+    if files is None:
         raise HTTPException(status_code=404, detail="Repository not found")
     
-    repo_info = repos[repo_name]
-    
-    # Get files for this repo
-    repo_files = []
-    for file_key, file_info in vector_store.metadata.get("files", {}).items():
-        if file_key.startswith(f"{repo_name}/"):
-            file_path = file_key[len(f"{repo_name}/"):]
-            repo_files.append({
-                "path": file_path,
-                "hash": file_info.get("file_hash"),
-                "processed_at": file_info.get("processed_at"),
-                "chunk_count": file_info.get("chunk_count", 0)
-            })
+    repo_files = [
+        {
+            "path": file_path,
+            "hash": file_info.get("file_hash"),
+            "processed_at": file_info.get("processed_at"),
+            "chunk_count": file_info.get("chunk_count", 0)
+        }
+        for file_path, file_info in files
+    ]
     
     return {
         "name": repo_name,
         "files": repo_files,
         "total_files": len(repo_files),
-        "total_chunks": repo_info.get("chunks", 0)
+        "total_chunks": vector_store.metadata["repos"][repo_name].get("total_chunks", 0)
     }
 
 
 @app.post("/reload")
 async def reload_database(background_tasks: BackgroundTasks):
     """Reload the vector database (useful after updates)"""
-    def reload_components():
-        global vector_store, search_model
-        try:
-            logger.info("Reloading vector store...")
-            vector_store = VectorStore()
-            logger.info("Vector store reloaded successfully")
-        except Exception as e:
-            logger.error(f"Error reloading vector store: {e}")
+    async def reload_components():
+        global vector_store
+        async with reload_lock:
+            try:
+                logger.info("Reloading vector store...")
+                # Fully load the new store off the event loop, then swap it in at once;
+                # cached query embeddings don't depend on the store and are kept
+                new_store = await asyncio.get_running_loop().run_in_executor(EXECUTOR, create_vector_store)
+                vector_store = new_store
+                logger.info("Vector store reloaded successfully")
+            except Exception as e:
+                logger.error(f"Error reloading vector store: {e}")
     
     background_tasks.add_task(reload_components)
     return {"message": "Database reload initiated"}
@@ -280,7 +421,8 @@ if __name__ == "__main__":
     parser.add_argument("--host", default="0.0.0.0", help="Host to bind to")
     parser.add_argument("--port", type=int, default=8000, help="Port to bind to")
     parser.add_argument("--reload", action="store_true", help="Enable auto-reload for development")
-    parser.add_argument("--workers", type=int, default=1, help="Number of worker processes")
+    parser.add_argument("--workers", type=int, default=min(os.cpu_count() or 1, 4),
+                        help="Number of worker processes (each loads its own model; the index is shared via mmap)")
     
     args = parser.parse_args()
     
@@ -289,5 +431,7 @@ if __name__ == "__main__":
         host=args.host,
         port=args.port,
         reload=args.reload,
-        workers=args.workers if not args.reload else 1
+        workers=args.workers if not args.reload else 1,
+        loop="uvloop",
+        http="httptools"
     )
\ No newline at end of file
@@ -1,9 +1,13 @@
 import pytest
 import asyncio
-from unittest.mock import patch, AsyncMock, MagicMock
+from collections import namedtuple
+from unittest.mock import patch, AsyncMock
 from prompts.prompts import Prompts
 from agents.news_agent import NewsAgent, NewscastSegment
 
+# Plain stand-in for NewsArticle; only attribute access is needed
+_Article = namedtuple("_Article", "title source published_at description url")
+
 class DummyPrompts(Prompts):
     def __init__(self):
         pass
@@ -13,13 +17,14 @@ class DummyPrompts(Prompts):
     def get_context_prompt(self):
         return "{articles} {focus_stories}"
 
+@pytest.fixture(scope="module")
+def agent():
+    # Shared across tests; each test patches only what it needs, within a context manager
+    return NewsAgent(prompts=DummyPrompts())
+
 @pytest.mark.asyncio
-async def test_generate_headlines_segment_success():
-    agent = NewsAgent(prompts=DummyPrompts())
-    dummy_articles = [
-        MagicMock(title=f"Title {i}", source="Source", published_at="2025-06-25", description="Desc", url="url")
-        for i in range(8)
-    ]
+async def test_generate_headlines_segment_success(agent):
+    dummy_articles = [_Article(f"Title {i}", "Source", "2025-06-25", "Desc", "url") for i in range(8)]
     with patch.object(agent.search_service, 'search_headlines', new=AsyncMock(return_value=dummy_articles)):
         with patch.object(agent, '_call_claude', return_value="Generated headlines"):
             segment = await agent.generate_headlines_segment(region="american", category="general")
@@ -29,8 +34,7 @@ async def test_generate_headlines_segment_success():
             assert len(segment.stories_covered) == 6
 
 @pytest.mark.asyncio
-async def test_generate_headlines_segment_no_articles():
-    agent = NewsAgent(prompts=DummyPrompts())
+async def test_generate_headlines_segment_no_articles(agent):
     with patch.object(agent.search_service, 'search_headlines', new=AsyncMock(return_value=[])):
         segment = await agent.generate_headlines_segment(region="american", category="general")
         assert segment.segment_type == 'headlines'
@@ -38,12 +42,8 @@ async def test_generate_headlines_segment_no_articles():
         assert segment.stories_covered == []
 
 @pytest.mark.asyncio
-async def test_generate_context_segment_success():
-    agent = NewsAgent(prompts=DummyPrompts())
-    dummy_articles = [
-        MagicMock(title=f"Title {i}", source="Source", published_at="2025-06-25", description="Desc", url="url")
-        for i in range(12)
-    ]
+async def test_generate_context_segment_success(agent):
+    dummy_articles = [_Article(f"Title {i}", "Source", "2025-06-25", "Desc", "url") for i in range(12)]
     with patch.object(agent.search_service, 'search_headlines', new=AsyncMock(return_value=dummy_articles)):
         with patch.object(agent, '_call_claude', return_value="Generated context"):
             segment = await agent.generate_context_segment(region="american", focus_stories=["Story1", "Story2"])
@@ -53,8 +53,7 @@ async def test_generate_context_segment_success():
             assert segment.stories_covered == ["Story1", "Story2"]
 
 @pytest.mark.asyncio
-async def test_generate_context_segment_no_articles():
-    agent = NewsAgent(prompts=DummyPrompts())
+async def test_generate_context_segment_no_articles(agent):
     with patch.object(agent.search_service, 'search_headlines', new=AsyncMock(return_value=[])):
         segment = await agent.generate_context_segment(region="american", focus_stories=None)
         assert segment.segment_type == 'context'
@@ -62,8 +61,7 @@ async def test_generate_context_segment_no_articles():
         assert segment.stories_covered == []
 
 @pytest.mark.asyncio
-async def test_generate_full_newscast():
-    agent = NewsAgent(prompts=DummyPrompts())
+async def test_generate_full_newscast(agent):
     dummy_headlines = NewscastSegment(
         segment_type='headlines',
         content='Headlines',
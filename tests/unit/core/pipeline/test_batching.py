@@ -0,0 +1,106 @@
+import pytest
+import asyncio
+import threading
+from pipeline.batching import MicroBatcher
+
+@pytest.mark.asyncio
+async def test_concurrent_submits_share_a_batch():
+    batches = []
+    def process(items):
+        batches.append(list(items))
+        return [item * 2 for item in items]
+
+    batcher = MicroBatcher(process, max_batch_size=8, max_wait_ms=50)
+    try:
+        results = await asyncio.gather(*(batcher.submit(i) for i in range(5)))
+    finally:
+        await batcher.close()
+
+    assert results == [0, 2, 4, 6, 8]
+    assert batches == [[0, 1, 2, 3, 4]]
+
+@pytest.mark.asyncio
+async def test_batches_split_at_max_batch_size():
+    batches = []
+    def process(items):
+        batches.append(list(items))
+        return items
+
+    batcher = MicroBatcher(process, max_batch_size=2, max_wait_ms=50)
+    try:
+        results = await asyncio.gather(*(batcher.submit(i) for i in range(5)))
+    finally:
+        await batcher.close()
+
+    assert results == [0, 1, 2, 3, 4]
+    assert sorted(len(batch) for batch in batches) == [1, 2, 2]
+
+@pytest.mark.asyncio
+async def test_exception_reaches_every_caller():
+    def process(items):
+        raise RuntimeError("boom")
+
+    batcher = MicroBatcher(process, max_batch_size=4, max_wait_ms=50)
+    try:
+        results = await asyncio.gather(*(batcher.submit(i) for i in range(3)), return_exceptions=True)
+    finally:
+        await batcher.close()
+
+    assert len(results) == 3
+    assert all(isinstance(result, RuntimeError) for result in results)
+
+@pytest.mark.asyncio
+async def test_short_result_fails_every_caller():
+    def process(items):
+        return items[:-1]
+
+    batcher = MicroBatcher(process, max_batch_size=4, max_wait_ms=50)
+    try:
+        results = await asyncio.wait_for(
+            asyncio.gather(*(batcher.submit(i) for i in range(3)), return_exceptions=True), timeout=1)
+    finally:
+        await batcher.close()
+
+    assert all(isinstance(result, ValueError) for result in results)
+
+@pytest.mark.asyncio
+async def test_slow_batch_does_not_block_the_next():
+    release = threading.Event()
+    def process(items):
+        # The first batch waits until a later batch has finished
+        if items == ["slow"]:
+            release.wait(timeout=1)
+            return ["slow done"]
+        release.set()
+        return items
+
+    batcher = MicroBatcher(process, max_batch_size=1, max_wait_ms=0, max_concurrent_batches=2)
+    try:
+        slow = asyncio.create_task(batcher.submit("slow"))
+        await asyncio.sleep(0.01)
+        assert await asyncio.wait_for(batcher.submit("fast"), timeout=0.5) == "fast"
+        assert await slow == "slow done"
+    finally:
+        release.set()
+        await batcher.close()
+
+@pytest.mark.asyncio
+async def test_close_fails_waiting_callers():
+    release = threading.Event()
+    def process(items):
+        release.wait(timeout=1)
+        return items
+
+    # One batch in flight, one waiting for a slot and one still queued
+    batcher = MicroBatcher(process, max_batch_size=1, max_wait_ms=0, max_concurrent_batches=1)
+    callers = [asyncio.create_task(batcher.submit(i)) for i in range(3)]
+    await asyncio.sleep(0.01)
+    try:
+        await batcher.close()
+        results = await asyncio.wait_for(asyncio.gather(*callers, return_exceptions=True), timeout=0.5)
+    finally:
+        release.set()
+
+    assert all(isinstance(result, RuntimeError) for result in results)
+    with pytest.raises(RuntimeError):
+        await batcher.submit(3)
@@ -0,0 +1,179 @@
+import pytest
+import numpy as np
+import faiss
+from concurrent.futures import ThreadPoolExecutor
+from pipeline.doc_processor import DocumentChunk
+from pipeline.vector_store import VectorStore, SELECTOR_CACHE_SIZE
+
+DIM = 16
+
+def make_chunks(source_file, repo_name, count, rng):
+    return [DocumentChunk(
+        content=f"{source_file} chunk {i}",
+        source_file=source_file,
+        repo_name=repo_name,
+        chunk_id=f"{repo_name}/{source_file}#{i}",
+        file_hash="hash",
+        metadata={},
+        embedding=rng.standard_normal(DIM).astype(np.float32)
+    ) for i in range(count)]
+
+def make_store(path, **kwargs):
+    return VectorStore(str(path / "index"), str(path / "metadata.json"), **kwargs)
+
+@pytest.fixture
+def rng():
+    return np.random.default_rng(0)
+
+@pytest.fixture
+def store(tmp_path, rng):
+    # Two repos, each with a markdown and a pdf file
+    store = make_store(tmp_path, index_type="flat")
+    for repo_name in ("alpha", "beta"):
+        for source_file in ("guide.md", "paper.pdf"):
+            store.add_chunks(make_chunks(source_file, repo_name, 4, rng))
+    return store
+
+def test_search_finds_stored_chunk(store):
+    query = np.array(store._embeddings[5])
+    chunk, score = store.search(query, k=1)[0]
+    assert chunk.chunk_id == "alpha/paper.pdf#1"
+    assert score == pytest.approx(1.0, abs=1e-5)
+
+def test_search_with_filters(store, rng):
+    query = rng.standard_normal(DIM).astype(np.float32)
+
+    results = store.search(query, k=16, repo_filter=["beta"])
+    assert len(results) == 8
+    assert {chunk.repo_name for chunk, _ in results} == {"beta"}
+
+    results = store.search(query, k=16, file_type_filter=[".pdf"])
+    assert len(results) == 8
+    assert {chunk.file_type for chunk, _ in results} == {".pdf"}
+
+    results = store.search(query, k=16, repo_filter=["alpha"], file_type_filter=[".md"])
+    assert {chunk.chunk_id for chunk, _ in results} == {f"alpha/guide.md#{i}" for i in range(4)}
+
+    assert store.search(query, k=16, repo_filter=["missing"]) == []
+
+def test_filters_see_updated_files(store, rng):
+    query = rng.standard_normal(DIM).astype(np.float32)
+    store.search(query, k=16, repo_filter=["beta"])  # Cache the beta selector
+
+    store.update_file("guide.md", "beta", [])
+    results = store.search(query, k=16, repo_filter=["beta"])
+    assert {chunk.source_file for chunk, _ in results} == {"paper.pdf"}
+
+def test_concurrent_filtered_searches(store, rng):
+    query = rng.standard_normal(DIM).astype(np.float32)
+
+    # Unknown repos make every filter distinct, so threads keep evicting each other's selectors
+    def search(i):
+        results = store.search(query, k=16, repo_filter=["beta", f"missing{i}"])
+        return {chunk.repo_name for chunk, _ in results}
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        assert all(repos == {"beta"} for repos in executor.map(search, range(4 * SELECTOR_CACHE_SIZE)))
+    assert len(store._selector_cache) == SELECTOR_CACHE_SIZE
+
+def test_rebuild_compacts_into_new_file(tmp_path, store, rng):
+    store.save_index()
+    saved = np.fromfile(store.embeddings_file, dtype=np.float32).copy()
+    query = np.array(store._embeddings[9])  # beta/guide.md#1
+
+    # Deleting three of four files passes the rebuild threshold
+    store.update_file("guide.md", "alpha", [])
+    store.update_file("paper.pdf", "alpha", [])
+    store.update_file("paper.pdf", "beta", [])
+
+    assert len(store.chunks) == store.live_chunk_count == 4
+    assert store._embeddings_backing_file == store.new_embeddings_file
+    assert np.array_equal(np.fromfile(store.embeddings_file, dtype=np.float32), saved)
+    assert store.search(query, k=1)[0][0].chunk_id == "beta/guide.md#1"
+
+    store.update_file("notes.md", "alpha", make_chunks("notes.md", "alpha", 2, rng))
+    store.save_index()
+    assert not store.new_embeddings_file.exists()
+
+    reloaded = make_store(tmp_path, index_type="flat")
+    assert reloaded.live_chunk_count == 6
+    assert reloaded.search(query, k=1)[0][0].chunk_id == "beta/guide.md#1"
+
+def test_flat_index_promoted_to_ivf(tmp_path, rng):
+    store = make_store(tmp_path, index_type="auto", ivf_min_vectors=200)
+    for i in range(4):
+        store.add_chunks(make_chunks(f"file{i}.md", "alpha", 40, rng))
+        assert faiss.try_extract_index_ivf(store.index) is None
+    store.add_chunks(make_chunks("file4.md", "alpha", 40, rng))
+
+    assert faiss.try_extract_index_ivf(store.index) is not None
+    assert store.index.ntotal == 200
+    query = np.array(store._embeddings[42])
+    assert store.search(query, k=1)[0][0].chunk_id == "alpha/file1.md#2"
+
+def test_mmap_reload(tmp_path, store, rng):
+    query = rng.standard_normal(DIM).astype(np.float32)
+    expected = [(chunk.chunk_id, score) for chunk, score in store.search(query, k=5, repo_filter=["alpha"])]
+    store.save_index()
+
+    reloaded = make_store(tmp_path, mmap=True)
+    assert reloaded.live_chunk_count == 16
+    results = [(chunk.chunk_id, score) for chunk, score in reloaded.search(query, k=5, repo_filter=["alpha"])]
+    assert [chunk_id for chunk_id, _ in results] == [chunk_id for chunk_id, _ in expected]
+    assert [score for _, score in results] == pytest.approx([score for _, score in expected], abs=1e-5)
+
+def test_delete_last_file_then_save_and_reload(tmp_path, rng):
+    store = make_store(tmp_path, index_type="flat")
+    store.add_chunks(make_chunks("guide.md", "alpha", 4, rng))
+    store.save_index()
+
+    store.update_file("guide.md", "alpha", [])
+    store.save_index()
+
+    reloaded = make_store(tmp_path, index_type="flat")
+    assert reloaded.live_chunk_count == 0
+    assert reloaded.index is None
+    assert not reloaded.get_repo_files("alpha")
+
+    reloaded.add_chunks(make_chunks("notes.md", "alpha", 2, rng))
+    reloaded.save_index()
+    query = np.array(reloaded._embeddings[1])
+    assert make_store(tmp_path, index_type="flat").search(query, k=1)[0][0].chunk_id == "alpha/notes.md#1"
+
+def test_gpu_copy_failure_falls_back_to_cpu(tmp_path, rng, monkeypatch):
+    def index_cpu_to_gpu(resources, device, index):
+        raise RuntimeError("index type not implemented on GPU")
+
+    monkeypatch.setattr(faiss, "get_num_gpus", lambda: 1)
+    monkeypatch.setattr(faiss, "StandardGpuResources", object, raising=False)
+    monkeypatch.setattr(faiss, "index_cpu_to_gpu", index_cpu_to_gpu, raising=False)
+
+    store = make_store(tmp_path, index_type="ivfpq", ivf_min_vectors=200, pq_m=8, use_gpu=True)
+    store.add_chunks(make_chunks("guide.md", "alpha", 256, rng))
+    assert store.use_gpu
+
+    store.load_gpu_index()
+    assert not store.use_gpu
+    query = np.array(store._embeddings[3])
+    assert store.search(query, k=1)[0][0].chunk_id == "alpha/guide.md#3"
+
+@pytest.mark.parametrize("index_type,quantize", [("ivf", True), ("ivfpq", False)])
+def test_quantized_results_rescored_exactly(tmp_path, rng, index_type, quantize):
+    store = make_store(tmp_path, index_type=index_type, quantize=quantize, pq_m=8, ivf_min_vectors=256)
+    store.add_chunks(make_chunks("guide.md", "alpha", 512, rng))
+    assert faiss.try_extract_index_ivf(store.index) is not None
+
+    query = rng.standard_normal(DIM).astype(np.float32)
+    unit_query = query / np.linalg.norm(query)
+    results = store.search(query, k=5)
+
+    # Scores are exact cosine similarities against the stored float32 vectors, best first
+    assert len(results) == 5
+    exact = [float(np.dot(store._embeddings[chunk.row_id], unit_query)) for chunk, _ in results]
+    assert [score for _, score in results] == pytest.approx(exact, abs=1e-5)
+    assert exact == sorted(exact, reverse=True)
+
+    query = np.array(store._embeddings[7])
+    chunk, score = store.search(query, k=1)[0]
+    assert chunk.chunk_id == "alpha/guide.md#7"
+    assert score == pytest.approx(1.0, abs=1e-5)
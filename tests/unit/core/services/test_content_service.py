@@ -0,0 +1,78 @@
+import pytest
+from services.content_service import AIContentService, BaseAIProvider, render_template, _parse_template
+from services.contracts import AIProviderConfig, AIProviderResponse
+from services.lean import GenerationRequest, ComponentType, LeanAxis, LeanLevel
+
+PROMPT_DATA = {"topic": "Cloud Security", "lean_z_score": -1, "ratio": 0.25, "context": "{}"}
+
+class DummyProvider(BaseAIProvider):
+    def __init__(self):
+        super().__init__(AIProviderConfig())
+        self.calls = []
+
+    async def _call_api(self, prompt_data):
+        self.calls.append(prompt_data)
+        return AIProviderResponse(content="<p>Generated</p>", model_info="dummy")
+
+    def _get_model_info(self):
+        return "dummy"
+
+def make_request(topic):
+    axis = LeanAxis(axis_name="basic-expert", axis_label="Expertise", axis_icon="🎓", levels={
+        "basic": LeanLevel(score=-2, name="Basic", description="Fundamentals"),
+        "intermediate": LeanLevel(score=-1, name="Intermediate", description="Some background"),
+        "advanced": LeanLevel(score=0, name="Advanced", description="Professional"),
+    })
+    return GenerationRequest(article_id="test", component_type=ComponentType.ARTICLE_CONTENT,
+                             lean_level=3, lean_axes=[axis], topic=topic)
+
+@pytest.mark.parametrize("template", [
+    "Plain text without fields",
+    "Topic: {topic}",
+    "{topic} scored {lean_z_score} with context {context}",
+    "Escaped {{braces}} around {topic}",
+    "Formatted {ratio:.1%} and {lean_z_score:+d}",
+    "Converted {topic!r} and {lean_z_score!s}",
+    "",
+], ids=["literal", "field", "fields", "escaped", "format_spec", "conversion", "empty"])
+def test_render_template_matches_format_map(template):
+    assert render_template(template, PROMPT_DATA) == template.format_map(PROMPT_DATA)
+
+def test_render_template_missing_field():
+    with pytest.raises(KeyError):
+        render_template("Topic: {missing}", PROMPT_DATA)
+
+def test_render_template_parses_once():
+    template = "Parsed once: {topic}"
+    render_template(template, PROMPT_DATA)
+    hits = _parse_template.cache_info().hits
+    render_template(template, {"topic": "Another topic"})
+    assert _parse_template.cache_info().hits == hits + 1
+
+def test_render_prompts_matches_format_map():
+    provider = DummyProvider()
+    prompt_data = provider._prepare_prompt(make_request("Cloud Security"))
+    templates = provider.prompt_templates
+    assert provider._render_prompts(prompt_data) == (templates.system_prompt.format_map(prompt_data),
+                                                     templates.user_prompt.format_map(prompt_data))
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("topic,valid", [
+    ("", False),
+    ("   ", False),
+    ("Cloud Security", True),
+], ids=["empty", "whitespace", "valid"])
+async def test_generate_content_validates_topic(topic, valid):
+    provider = DummyProvider()
+    service = AIContentService(provider)
+    if valid:
+        response = await service.generate_content(make_request(topic))
+        assert response.success
+        assert [call["topic"] for call in provider.calls] == [topic]
+    else:
+        with pytest.raises(ValueError):
+            await service.generate_content(make_request(topic))
+        with pytest.raises(ValueError):
+            async for _ in service.stream_content(make_request(topic)):
+                pass
+        assert provider.calls == []
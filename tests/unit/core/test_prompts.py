@@ -1,60 +1,46 @@
-import os
-import tempfile
-import shutil
 import pytest
 from prompts import Prompts
 from pathlib import Path
 
-def create_temp_prompt_dir():
-    temp_dir = tempfile.mkdtemp()
-    context_path = Path(temp_dir) / "context.txt"
-    headlines_path = Path(temp_dir) / "headlines.txt"
-    context_path.write_text("This is a context prompt.")
-    headlines_path.write_text("This is a headlines prompt.")
-    return Path(temp_dir)
-
-def test_prompts_init_valid():
-    temp_dir = create_temp_prompt_dir()
-    try:
-        prompts = Prompts(temp_dir)
-        assert prompts._base_path.exists()
-    finally:
-        shutil.rmtree(str(temp_dir))
+def write_prompt_files(directory: Path) -> Path:
+    (directory / "context.txt").write_text("This is a context prompt.")
+    (directory / "headlines.txt").write_text("This is a headlines prompt.")
+    return directory
+
+@pytest.fixture(scope="session")
+def prompt_dir(tmp_path_factory):
+    # Shared by tests that only read the prompt files
+    return write_prompt_files(tmp_path_factory.mktemp("prompts"))
+
+def test_prompts_init_valid(prompt_dir):
+    prompts = Prompts(prompt_dir)
+    assert prompts._base_path.exists()
 
 def test_prompts_init_invalid():
     with pytest.raises(FileNotFoundError):
         Prompts(Path("/nonexistent/path/to/prompts"))
 
-def test_get_prompt_success():
-    temp_dir = create_temp_prompt_dir()
-    try:
-        prompts = Prompts(temp_dir)
-        assert prompts.get_prompt("context") == "This is a context prompt."
-        assert prompts.get_prompt("headlines") == "This is a headlines prompt."
-    finally:
-        shutil.rmtree(str(temp_dir))
-
-def test_get_prompt_missing_file():
-    temp_dir = create_temp_prompt_dir()
-    try:
-        prompts = Prompts(temp_dir)
-        with pytest.raises(FileNotFoundError):
-            prompts.get_prompt("missing")
-    finally:
-        shutil.rmtree(str(temp_dir))
-
-def test_get_context_prompt():
-    temp_dir = create_temp_prompt_dir()
-    try:
-        prompts = Prompts(temp_dir)
-        assert prompts.get_context_prompt() == "This is a context prompt."
-    finally:
-        shutil.rmtree(str(temp_dir))
-
-def test_get_headlines_prompt():
-    temp_dir = create_temp_prompt_dir()
-    try:
-        prompts = Prompts(temp_dir)
-        assert prompts.get_headlines_prompt() == "This is a headlines prompt."
-    finally:
-        shutil.rmtree(str(temp_dir))
+def test_get_prompt_success(prompt_dir):
+    prompts = Prompts(prompt_dir)
+    assert prompts.get_prompt("context") == "This is a context prompt."
+    assert prompts.get_prompt("headlines") == "This is a headlines prompt."
+
+def test_get_prompt_missing_file(prompt_dir):
+    prompts = Prompts(prompt_dir)
+    with pytest.raises(FileNotFoundError):
+        prompts.get_prompt("missing")
+
+def test_get_context_prompt(prompt_dir):
+    prompts = Prompts(prompt_dir)
+    assert prompts.get_context_prompt() == "This is a context prompt."
+
+def test_get_headlines_prompt(prompt_dir):
+    prompts = Prompts(prompt_dir)
+    assert prompts.get_headlines_prompt() == "This is a headlines prompt."
+
+def test_get_prompt_cached_at_init(tmp_path):
+    # Modifies a prompt file, so it gets its own directory
+    prompt_dir = write_prompt_files(tmp_path)
+    prompts = Prompts(prompt_dir)
+    (prompt_dir / "context.txt").write_text("Changed on disk.")
+    assert prompts.get_context_prompt() == "This is a context prompt."
@@ -5,101 +5,61 @@ from services import NewsSearchService, NewsArticle
 import httpx
 from unittest.mock import patch
 
-@pytest.mark.asyncio
-async def test_search_headlines_success(monkeypatch):
-    # Mock httpx.AsyncClient.get to return a fake response
-    class MockResponse:
-        def raise_for_status(self):
-            pass
-        def json(self):
-            return {
-                "data": [
-                    {
-                        "title": "Test Headline",
-                        "description": "Test Description",
-                        "url": "http://example.com",
-                        "source": "Example Source",
-                        "published_at": "2025-06-25T12:00:00Z",
-                        "image_url": "http://example.com/image.jpg",
-                        "categories": ["general"]
-                    }
-                ]
-            }
-    async def mock_get(*args, **kwargs):
-        return MockResponse()
-    with patch("httpx.AsyncClient.get", new=mock_get):
-        service = NewsSearchService(api_key="fake")
-        articles = await service.search_headlines(region="american", category="general", limit=1)
-        assert len(articles) == 1
-        assert articles[0].title == "Test Headline"
-        assert articles[0].category == "general"
+class MockResponse:
+    def __init__(self, payload, error=None):
+        self._payload = payload
+        self._error = error
+    def raise_for_status(self):
+        if self._error:
+            raise self._error("error")
+    def json(self):
+        return self._payload
 
-@pytest.mark.asyncio
-async def test_search_headlines_empty(monkeypatch):
-    class MockResponse:
-        def raise_for_status(self):
-            pass
-        def json(self):
-            return {"data": []}
-    async def mock_get(*args, **kwargs):
-        return MockResponse()
-    with patch("httpx.AsyncClient.get", new=mock_get):
-        service = NewsSearchService(api_key="fake")
-        articles = await service.search_headlines(region="american", category="general", limit=1)
-        assert articles == []
+HEADLINE = {
+    "title": "Test Headline",
+    "description": "Test Description",
+    "url": "http://example.com",
+    "source": "Example Source",
+    "published_at": "2025-06-25T12:00:00Z",
+    "image_url": "http://example.com/image.jpg",
+    "categories": ["general"]
+}
 
-@pytest.mark.asyncio
-async def test_search_by_keywords_success(monkeypatch):
-    class MockResponse:
-        def raise_for_status(self):
-            pass
-        def json(self):
-            return {
-                "data": [
-                    {
-                        "title": "AI News",
-                        "description": "AI Description",
-                        "url": "http://example.com/ai",
-                        "source": "AI Source",
-                        "published_at": "2025-06-25T12:00:00Z",
-                        "image_url": None,
-                        "categories": ["technology"]
-                    }
-                ]
-            }
-    async def mock_get(*args, **kwargs):
-        return MockResponse()
-    with patch("httpx.AsyncClient.get", new=mock_get):
-        service = NewsSearchService(api_key="fake")
-        articles = await service.search_by_keywords("AI", region="american", limit=1)
-        assert len(articles) == 1
-        assert articles[0].title == "AI News"
-        assert articles[0].category == "technology"
+AI_NEWS = {
+    "title": "AI News",
+    "description": "AI Description",
+    "url": "http://example.com/ai",
+    "source": "AI Source",
+    "published_at": "2025-06-25T12:00:00Z",
+    "image_url": None,
+    "categories": ["technology"]
+}
 
-@pytest.mark.asyncio
-async def test_search_headlines_http_error(monkeypatch):
-    class MockResponse:
-        def raise_for_status(self):
-            raise httpx.RequestError("error")
-        def json(self):
-            return {}
-    async def mock_get(*args, **kwargs):
-        return MockResponse()
-    with patch("httpx.AsyncClient.get", new=mock_get):
-        service = NewsSearchService(api_key="fake")
-        articles = await service.search_headlines(region="american", category="general", limit=1)
-        assert articles == []
+HEADLINES_KWARGS = {"region": "american", "category": "general", "limit": 1}
+KEYWORDS_KWARGS = {"keywords": "AI", "region": "american", "limit": 1}
 
 @pytest.mark.asyncio
-async def test_search_by_keywords_http_error(monkeypatch):
-    class MockResponse:
-        def raise_for_status(self):
-            raise httpx.RequestError("error")
-        def json(self):
-            return {}
+@pytest.mark.parametrize("method,kwargs,payload,error,expected", [
+    ("search_headlines", HEADLINES_KWARGS, {"data": [HEADLINE]}, None, [("Test Headline", "general")]),
+    ("search_headlines", HEADLINES_KWARGS, {"data": []}, None, []),
+    ("search_by_keywords", KEYWORDS_KWARGS, {"data": [AI_NEWS]}, None, [("AI News", "technology")]),
+    ("search_headlines", HEADLINES_KWARGS, {}, httpx.RequestError, []),
+    ("search_by_keywords", KEYWORDS_KWARGS, {}, httpx.RequestError, []),
+], ids=[
+    "headlines_success",
+    "headlines_empty",
+    "keywords_success",
+    "headlines_http_error",
+    "keywords_http_error",
+])
+async def test_search(method, kwargs, payload, error, expected):
     async def mock_get(*args, **kwargs):
-        return MockResponse()
+        return MockResponse(payload, error)
     with patch("httpx.AsyncClient.get", new=mock_get):
         service = NewsSearchService(api_key="fake")
-        articles = await service.search_by_keywords("AI", region="american", limit=1)
-        assert articles == []
+        articles = await getattr(service, method)(**kwargs)
+        if expected:
+            assert len(articles) == len(expected)
+            assert [(article.title, article.category) for article in articles] == expected
+        else:
+            assert articles == []